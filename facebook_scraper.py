@@ -9,42 +9,134 @@ The script finds ad links on the marketplace search page, visits each ad, extrac
 and tracks changes over time.
 """
 import argparse
-import json
-import time
+import orjson
+import os
+import asyncio
 from urllib.parse import urljoin, urlparse, parse_qs
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
 import re
+import time
+import traceback
 from datetime import datetime
-import hashlib
+import xxhash
+
+
+# Facebook's generated class chains, kept in one place so they are easy to update
+PRICE_SPAN_SEL = 'span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.x4zkp8e.x3x7a5m.x1lkfr7t.x1lbecb7.x1s688f.xzsf02u'
+LOCATION_PREVIEW_SPAN_SEL = 'span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.x4zkp8e.x676frb.x1nxh6w3.x1sibtaa.xo1l8bm.xi81zsa'
+LOCATION_SPAN_SEL = 'span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1nxh6w3.x1sibtaa.xo1l8bm.xi81zsa'
+CONDITION_SPAN_SEL = 'span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.x4zkp8e.x676frb.x1nxh6w3.x1sibtaa.x1s688f.x1fey0fg'
+TITLE_SEL = 'h1.html-h1.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x1vvkbs.x1heor9g.x1qlqyl8.x1pd3egz.x1a2a7pz.x193iq5w.xeuugli span'
+DESC_SPAN_SEL = 'span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.x4zkp8e.x3x7a5m.x6prxxf.xvq8zen.xo1l8bm.xzsf02u'
+# Dismissible popup close buttons (English, French and Hebrew UI), matched in one query
+CLOSE_POPUP_SEL = ':is(div[aria-label="Close"], div[aria-label="Fermer"], div[aria-label="סגור"])[role="button"] >> visible=true'
+
+# Mirrors the per-field rules of extract_car_details so the page is read in one evaluate()
+# (the description is read separately since it has to be expanded first)
+EXTRACT_DETAILS_JS = """
+(sel) => {
+    const texts = (s) => Array.from(document.querySelectorAll(s), (el) => (el.textContent || '').trim());
+    const published = Array.from(document.querySelectorAll('abbr'),
+        (el) => el.getAttribute('aria-label') || (el.textContent || '').trim()).find((t) => t);
+    const seller = document.querySelector('a[href*="/profile/"]');
+    return {
+        condition: texts(sel.condition).find((t) => t && t.length < 50),
+        title: texts(sel.title)[0],
+        price: texts(sel.price).find((t) => t.includes('₪') || t.toLowerCase().includes('gratuit')),
+        location: texts(sel.location).find((t) => (t && t.includes(', ')) || (t.length > 3 && t.length < 50)),
+        published: published,
+        // Thumbnails repeat the gallery images; a Set keeps the first of each URL
+        images: [...new Set(Array.from(document.querySelectorAll('img[referrerpolicy="origin-when-cross-origin"]'),
+            (img) => img.getAttribute('src')).filter((src) => src && src.includes('scontent')))],
+        seller: seller ? (seller.textContent || '').trim() : null,
+    };
+}
+"""
+
+# Scrolls until an end marker shows up, the page stops growing or maxScroll loads happened.
+# The wait between scrolls doubles (400ms up to 3.2s) while the page height is unchanged.
+SCROLL_TO_END_JS = """
+([markers, maxScroll]) => new Promise((resolve) => {
+    let lastHeight = 0;
+    let scrolls = 0;
+    let delay = 400;
+    const tick = () => {
+        const text = document.body.innerText;
+        if (markers.some((m) => text.includes(m))) {
+            return resolve({reason: 'end', scrolls: scrolls});
+        }
+        const height = document.body.scrollHeight;
+        if (height !== lastHeight) {
+            lastHeight = height;
+            scrolls++;
+            delay = 400;
+        } else {
+            delay *= 2;
+        }
+        if (scrolls >= maxScroll) {
+            return resolve({reason: 'max', scrolls: scrolls});
+        }
+        if (delay > 3200) {
+            return resolve({reason: 'stable', scrolls: scrolls});
+        }
+        window.scrollTo(0, height);
+        setTimeout(tick, delay);
+    };
+    tick();
+})
+"""
+
+# Walks up to 5 ancestors of each listing link looking for the card's price and location
+FIND_LISTINGS_JS = """
+(sel) => Array.from(document.querySelectorAll('a[href*="/marketplace/item/"]'), (a) => {
+    let price = null;
+    let location = null;
+    for (let el = a, level = 0; el && level < 5; el = el.parentElement, level++) {
+        if (price === null) {
+            price = Array.from(el.querySelectorAll(sel.price), (s) => (s.textContent || '').trim())
+                .find((t) => t && (t.includes('₪') || t.toLowerCase().includes('gratuit')
+                    || /^\\d+$/.test(t.replace(/[ ,]/g, '')))) || null;
+        }
+        if (location === null) {
+            // Location typically has comma or place name
+            location = Array.from(el.querySelectorAll(sel.location), (s) => (s.textContent || '').trim())
+                .find((t) => t.length > 2) || null;
+        }
+    }
+    return {href: a.getAttribute('href'), price: price, location: location};
+})
+"""
+
+ITEM_ID_RE = re.compile(r'/marketplace/item/(\d+)')
+PRICE_DIGITS_RE = re.compile(r'(\d+)')
+# Spaces, thousands separators and currency symbols dropped by parse_price in one pass
+PRICE_STRIP_TABLE = str.maketrans('', '', ' ,₪$')
 
 
 def unique_preserve_order(seq):
-    seen = set()
-    out = []
-    for x in seq:
-        if x not in seen:
-            seen.add(x)
-            out.append(x)
-    return out
+    return list(dict.fromkeys(seq))
 
 
 def extract_item_id(url):
     """Extract the item ID from a Facebook Marketplace URL."""
-    match = re.search(r'/marketplace/item/(\d+)', url)
+    match = ITEM_ID_RE.search(url)
     return match.group(1) if match else None
 
 
 def load_config(config_path):
     """Load configuration from JSON file."""
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(config_path, 'rb') as f:
+        config = orjson.loads(f.read())
+    # Index searches by name for constant-time lookup in scrape_search
+    config['_searches_by_name'] = {s['name']: s for s in config.get('searches', [])}
+    return config
 
 
 def load_previous_results(output_file):
     """Load previous scraping results if they exist."""
     try:
-        with open(output_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(output_file, 'rb') as f:
+            data = orjson.loads(f.read())
             # Handle both old format (list) and new format (dict with 'cars' key)
             if isinstance(data, dict) and 'cars' in data:
                 cars = data['cars']
@@ -58,17 +150,74 @@ def load_previous_results(output_file):
         return {}
 
 
+# Progress files older than this are left over from a crash, not an interrupted run to resume
+PROGRESS_MAX_AGE = 12 * 60 * 60  # seconds
+
+
+def load_progress(progress_file, search_key):
+    """Load listings already scraped by an interrupted run from its NDJSON progress file.
+    
+    The first line is a header with the search URL and start time; a file left by a
+    different search or older than PROGRESS_MAX_AGE is deleted instead of resumed.
+    """
+    cars = {}
+    try:
+        with open(progress_file, 'rb') as f:
+            try:
+                header = orjson.loads(f.readline()).get('progress_header') or {}
+            except (orjson.JSONDecodeError, AttributeError):
+                header = {}
+            if (header.get('search_key') == search_key
+                    and time.time() - header.get('started_at', 0) < PROGRESS_MAX_AGE):
+                for line in f:
+                    try:
+                        car = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue  # Partial line left by a crash mid-write
+                    cars[car['item_id']] = car
+                return cars
+        print(f'Ignoring stale progress file {progress_file}')
+        os.remove(progress_file)
+    except FileNotFoundError:
+        pass
+    return cars
+
+
+# Stored on each car next to its hash; records written with another scheme (e.g. the old
+# md5-over-JSON hashes, which have no version) are rehashed instead of reported as changed.
+# Bump when calculate_car_hash changes its fields, encoding or algorithm (3: xxh64 -> xxh3).
+CAR_HASH_VERSION = 3
+
+
+def new_field_hasher():
+    """Return the fast non-cryptographic hasher (xxh3, as in scraper.py) used for all stored hashes.
+    
+    There is deliberately no fallback: a different algorithm would make every stored
+    hash mismatch and report every listing as changed.
+    """
+    return xxhash.xxh3_64()
+
+
 def calculate_car_hash(car):
     """Calculate a hash of important car fields to detect changes."""
-    important_fields = {
-        'price': car.get('price'),
-        'title': car.get('title'),
-        'description': car.get('description'),
-        'location': car.get('location'),
-        'condition': car.get('condition'),
-    }
-    hash_str = json.dumps(important_fields, sort_keys=True, ensure_ascii=False)
-    return hashlib.md5(hash_str.encode()).hexdigest()
+    h = new_field_hasher()
+    for field in ('price', 'title', 'description', 'location', 'condition'):
+        value = car.get(field)
+        if value is not None:
+            h.update(value.encode('utf-8') if isinstance(value, str) else str(value).encode('utf-8'))
+        else:
+            h.update(b'\x00')
+        h.update(b'\x1f')  # Field separator so adjacent values cannot run together
+    return h.hexdigest()
+
+
+def calculate_preview_hash(listing):
+    """Hash the price and location shown on the search results card."""
+    h = new_field_hasher()
+    h.update(str(listing.get('price_preview')).encode('utf-8'))
+    h.update(b'\x1f')
+    h.update(str(listing.get('location_preview')).encode('utf-8'))
+    return h.hexdigest()
 
 
 def parse_price(price_str):
@@ -77,16 +226,28 @@ def parse_price(price_str):
         return None
     # Remove currency symbols and extract number
     # Handle formats like "135 000 ₪" or "125,000 ₪" or "Gratuit"
-    if 'gratuit' in price_str.lower() or 'free' in price_str.lower():
+    lowered = price_str.lower()
+    if 'gratuit' in lowered or 'free' in lowered:
         return 0
     
     # Remove spaces and common separators
-    cleaned = price_str.replace(' ', '').replace(',', '').replace('₪', '').replace('$', '')
-    match = re.search(r'(\d+)', cleaned)
+    cleaned = price_str.translate(PRICE_STRIP_TABLE)
+    # Most prices are only digits once stripped, so skip the regex for them
+    if cleaned.isdecimal():
+        return int(cleaned)
+    match = PRICE_DIGITS_RE.search(cleaned)
     return int(match.group(1)) if match else None
 
 
-def find_marketplace_listings(page, max_scroll=50):
+async def block_resources(route):
+    """Block images, fonts, media and stylesheets; listing data is read from the DOM."""
+    if route.request.resource_type in ["image", "media", "font", "stylesheet"]:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def find_marketplace_listings(page, max_scroll=50):
     """Extract car listings from Facebook Marketplace search page.
     Returns: list of dicts with 'url', 'title', 'price', 'location' keys
     """
@@ -94,49 +255,37 @@ def find_marketplace_listings(page, max_scroll=50):
     
     print(f'Scrolling page to load more listings...')
     
-    # Scroll to load more items until we see "Results outside your search" or hit max scrolls
-    scroll_count = 0
-    end_of_results_found = False
-    
-    while scroll_count < max_scroll and not end_of_results_found:
-        # Scroll down
-        page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-        time.sleep(1.5)
-        scroll_count += 1
-        
-        # Check for end of search results markers
-        # French: "Résultats en dehors de votre recherche"
-        # English: "Results outside your search" or similar
-        end_markers = [
-            'Résultats en dehors de votre recherche',
-            'Results outside your search',
-            'תוצאות מחוץ לחיפוש שלך'
-        ]
-        
-        for marker in end_markers:
-            if page.locator(f'text="{marker}"').count() > 0:
-                print(f'  Scroll {scroll_count}: Found end of search results')
-                end_of_results_found = True
-                break
-        
-        if not end_of_results_found:
-            print(f'  Scroll {scroll_count}')
+    # Scroll to load more items until we see "Results outside your search", the page
+    # stops growing, or we hit max scrolls. The loop runs in the browser and backs off
+    # while nothing new loads instead of sleeping a fixed time per scroll.
+    # French: "Résultats en dehors de votre recherche"
+    # English: "Results outside your search" or similar
+    end_markers = [
+        'Résultats en dehors de votre recherche',
+        'Results outside your search',
+        'תוצאות מחוץ לחיפוש שלך'
+    ]
+    scroll = await page.evaluate(SCROLL_TO_END_JS, [end_markers, max_scroll])
     
-    if not end_of_results_found:
+    if scroll['reason'] == 'end':
+        print(f'  Scroll {scroll["scrolls"]}: Found end of search results')
+    elif scroll['reason'] == 'stable':
+        print(f'  Scroll {scroll["scrolls"]}: No more listings loading')
+    else:
         print(f'  Reached max scrolls ({max_scroll})')
     
-    # Wait for listings to load
-    time.sleep(2)
-    
-    # Find all marketplace listing links
+    # Find all marketplace listing links and their card previews in one round-trip
     # Looking for links with href containing "/marketplace/item/"
-    all_links = page.query_selector_all('a[href*="/marketplace/item/"]')
-    print(f'Found {len(all_links)} links containing /marketplace/item/')
+    raw_links = await page.evaluate(FIND_LISTINGS_JS, {
+        'price': PRICE_SPAN_SEL,
+        'location': LOCATION_PREVIEW_SPAN_SEL,
+    })
+    print(f'Found {len(raw_links)} links containing /marketplace/item/')
     
     seen_urls = set()
     
-    for link in all_links:
-        href = link.get_attribute('href')
+    for link in raw_links:
+        href = link['href']
         if not href:
             continue
         
@@ -153,60 +302,56 @@ def find_marketplace_listings(page, max_scroll=50):
         
         seen_urls.add(item_id)
         
-        # Try to extract preview information from the listing card
-        # The price is in a span with specific classes
-        price_text = None
-        location_text = None
-        
-        # Look for price in parent container
-        parent = link
-        for _ in range(5):  # Go up a few levels
-            if parent:
-                # Try to find price
-                price_spans = parent.query_selector_all('span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.x4zkp8e.x3x7a5m.x1lkfr7t.x1lbecb7.x1s688f.xzsf02u')
-                for span in price_spans:
-                    text = span.text_content().strip()
-                    if text and ('₪' in text or 'gratuit' in text.lower() or text.replace(' ', '').replace(',', '').isdigit()):
-                        price_text = text
-                        break
-                
-                # Try to find location
-                location_spans = parent.query_selector_all('span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.x4zkp8e.x676frb.x1nxh6w3.x1sibtaa.xo1l8bm.xi81zsa')
-                for span in location_spans:
-                    text = span.text_content().strip()
-                    # Location typically has comma or place name
-                    if text and len(text) > 2:
-                        location_text = text
-                        break
-                
-                parent = parent.query_selector('..')
-        
         results.append({
             'url': full_url,
             'item_id': item_id,
-            'price_preview': price_text,
-            'location_preview': location_text
+            'price_preview': link['price'],
+            'location_preview': link['location']
         })
     
     print(f'Extracted {len(results)} unique listings')
     return results
 
 
-def extract_car_details(page, url):
+async def extract_description(page):
+    """Expand the listing description if it is collapsed, then return its full text."""
+    # First, try to expand the description by clicking "Voir plus" / "See more"
+    try:
+        buttons = page.locator('div[role="button"]')
+        for i, text in enumerate(await buttons.all_text_contents()):
+            text = text.strip().lower()
+            if 'voir plus' in text or 'see more' in text or 'ראה עוד' in text:
+                print('    Expanding description...')
+                await buttons.nth(i).click()
+                await asyncio.sleep(0.5)  # Brief wait for expansion
+                break
+    except Exception as e:
+        print(f'    Note: Could not expand description: {e}')
+    
+    for text in await page.locator(DESC_SPAN_SEL).all_text_contents():
+        text = text.strip()
+        # Description is usually longer
+        if len(text) > 100:
+            # Remove "Voir moins" / "See less" button text if present
+            return text.replace('Voir moins', '').replace('See less', '').replace('ראה פחות', '').strip()
+    return None
+
+
+async def extract_car_details(page, url):
     """Extract detailed car information from a Facebook Marketplace listing page."""
     try:
-        page.wait_for_load_state('domcontentloaded', timeout=30000)
-        time.sleep(1)  # Brief wait for dynamic content
+        await page.wait_for_load_state('domcontentloaded', timeout=30000)
+        await asyncio.sleep(1)  # Brief wait for dynamic content
     except Exception as e:
         print(f'    Warning: Page load timeout: {e}')
     
     # Try to close the login popup if it appears on the car page
     try:
-        close_button = page.query_selector('div[aria-label="Close"][role="button"]')
+        close_button = await page.query_selector('div[aria-label="Close"][role="button"]')
         if close_button:
             print('    Closing login popup...')
-            close_button.click()
-            time.sleep(1)
+            await close_button.click()
+            await asyncio.sleep(1)
     except Exception as e:
         pass  # Silently continue if no popup
     
@@ -216,128 +361,49 @@ def extract_car_details(page, url):
         'scraped_at': datetime.now().isoformat(),
     }
     
-    # Extract condition (NEUF, etc.)
-    try:
-        condition_elements = page.query_selector_all('span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.x4zkp8e.x676frb.x1nxh6w3.x1sibtaa.x1s688f.x1fey0fg')
-        for elem in condition_elements:
-            text = elem.text_content().strip()
-            if text and len(text) < 50:  # Condition should be short
-                details['condition'] = text
-                break
-    except Exception as e:
-        print(f'    Could not extract condition: {e}')
-    
-    # Extract title (h1)
-    try:
-        title_element = page.query_selector('h1.html-h1.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x1vvkbs.x1heor9g.x1qlqyl8.x1pd3egz.x1a2a7pz.x193iq5w.xeuugli span')
-        if title_element:
-            details['title'] = title_element.text_content().strip()
-    except Exception as e:
-        print(f'    Could not extract title: {e}')
-    
-    # Extract price
-    try:
-        price_elements = page.query_selector_all('span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.x4zkp8e.x3x7a5m.x1lkfr7t.x1lbecb7.x1s688f.xzsf02u')
-        for elem in price_elements:
-            text = elem.text_content().strip()
-            if '₪' in text or 'gratuit' in text.lower():
-                details['price'] = text
-                details['price_numeric'] = parse_price(text)
-                break
-    except Exception as e:
-        print(f'    Could not extract price: {e}')
-    
-    # Extract location
-    try:
-        # Location is in a link with specific pattern
-        location_links = page.query_selector_all('a[href*="/marketplace/"]')
-        for link in location_links:
-            spans = link.query_selector_all('span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1nxh6w3.x1sibtaa.xo1l8bm.xi81zsa')
-            for span in spans:
-                text = span.text_content().strip()
-                if text and ', ' in text or (len(text) > 3 and len(text) < 50):
-                    details['location'] = text
-                    break
-            if 'location' in details:
-                break
-    except Exception as e:
-        print(f'    Could not extract location: {e}')
-    
-    # Extract publish date/time
-    try:
-        # Look for "Publié il y a..." text
-        time_elements = page.query_selector_all('abbr')
-        for elem in time_elements:
-            aria_label = elem.get_attribute('aria-label')
-            text = elem.text_content().strip()
-            if aria_label or text:
-                details['published'] = aria_label or text
-                break
-    except Exception as e:
-        print(f'    Could not extract publish date: {e}')
-    
-    # Extract description
-    try:
-        # First, try to expand the description by clicking "Voir plus" / "See more"
-        try:
-            see_more_buttons = page.query_selector_all('div[role="button"]')
-            for button in see_more_buttons:
-                text = button.text_content().strip().lower()
-                if 'voir plus' in text or 'see more' in text or 'ראה עוד' in text:
-                    print('    Expanding description...')
-                    button.click()
-                    time.sleep(0.5)  # Brief wait for expansion
-                    break
-        except Exception as e:
-            print(f'    Note: Could not expand description: {e}')
-        
-        # Description is in a span with specific classes
-        desc_elements = page.query_selector_all('span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.xlh3980.xvmahel.x1n0sxbx.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.x4zkp8e.x3x7a5m.x6prxxf.xvq8zen.xo1l8bm.xzsf02u')
-        for elem in desc_elements:
-            text = elem.text_content().strip()
-            # Description is usually longer
-            if len(text) > 100:
-                # Remove "Voir moins" / "See less" button text if present
-                text = text.replace('Voir moins', '').replace('See less', '').replace('ראה פחות', '').strip()
-                details['description'] = text
-                break
-    except Exception as e:
-        print(f'    Could not extract description: {e}')
-    
-    # Extract all images
-    try:
-        images = []
-        img_elements = page.query_selector_all('img[referrerpolicy="origin-when-cross-origin"]')
-        for img in img_elements:
-            src = img.get_attribute('src')
-            if src and 'scontent' in src:  # Facebook content URLs
-                images.append(src)
-        if images:
-            details['images'] = images
-    except Exception as e:
-        print(f'    Could not extract images: {e}')
+    # The description needs a click to expand first; the other fields are read in a
+    # single round-trip to the browser while that happens
+    data, description = await asyncio.gather(
+        page.evaluate(EXTRACT_DETAILS_JS, {
+            'condition': CONDITION_SPAN_SEL,
+            'title': TITLE_SEL,
+            'price': PRICE_SPAN_SEL,
+            'location': f'a[href*="/marketplace/"] {LOCATION_SPAN_SEL}',
+        }),
+        extract_description(page),
+        return_exceptions=True
+    )
+    if isinstance(data, Exception):
+        print(f'    Could not extract details: {data}')
+        data = {}
+    if isinstance(description, Exception):
+        print(f'    Could not extract description: {description}')
+        description = None
     
-    # Try to extract seller information
-    try:
-        # Look for seller name or profile link
-        seller_links = page.query_selector_all('a[href*="/profile/"]')
-        if seller_links:
-            seller_name = seller_links[0].text_content().strip()
-            if seller_name:
-                details['seller'] = seller_name
-    except Exception as e:
-        print(f'    Could not extract seller info: {e}')
+    if data.get('condition'):
+        details['condition'] = data['condition']
+    if data.get('title'):
+        details['title'] = data['title']
+    if data.get('price'):
+        details['price'] = data['price']
+        details['price_numeric'] = parse_price(data['price'])
+    if data.get('location'):
+        details['location'] = data['location']
+    if data.get('published'):
+        details['published'] = data['published']
+    if description:
+        details['description'] = description
+    if data.get('images'):
+        details['images'] = data['images']
+    if data.get('seller'):
+        details['seller'] = data['seller']
     
     return details
 
 
-def scrape_search(config, search_name, output_file, headless=True):
-    """Scrape cars for a specific search configuration."""
-    search = None
-    for s in config['searches']:
-        if s['name'] == search_name:
-            search = s
-            break
+async def scrape_search(config, search_name, output_file, browser):
+    """Scrape cars for a specific search configuration using an already running browser."""
+    search = config['_searches_by_name'].get(search_name)
     
     if not search:
         print(f'Search "{search_name}" not found in config')
@@ -350,161 +416,255 @@ def scrape_search(config, search_name, output_file, headless=True):
     previous_cars = load_previous_results(output_file)
     print(f'Loaded {len(previous_cars)} previous results')
     
-    with sync_playwright() as p:
-        browser_type = config['scraper_settings'].get('browser', 'chromium')
-        browser = getattr(p, browser_type).launch(headless=headless)
+    settings = config['scraper_settings']
+    
+    # Reuse the saved Facebook session, if any, to skip the manual login
+    state_file = settings.get('storage_state_file', 'fb_state.json')
+    context = await browser.new_context(
+        storage_state=state_file if os.path.exists(state_file) else None,
+        viewport={'width': 1280, 'height': 1024}
+    )
+    listing_contexts = []
+    
+    try:
+        page = await context.new_page()
         
+        print(f'Navigating to search page...')
+        await page.goto(search['url'], wait_until='domcontentloaded', timeout=60000)
+        await asyncio.sleep(3)
+        
+        # Check for login requirements
         try:
-            page = browser.new_page()
-            page.set_viewport_size({'width': 1280, 'height': 1024})
+            # Wait a bit for the page to fully load
+            await asyncio.sleep(2)
             
-            print(f'Navigating to search page...')
-            page.goto(search['url'], wait_until='domcontentloaded', timeout=60000)
-            time.sleep(3)
+            # Check if we see a login form (means not logged in)
+            login_form = await page.query_selector('form#login_popup_cta_form')
             
-            # Check for login requirements
-            try:
-                # Wait a bit for the page to fully load
-                time.sleep(2)
+            if login_form or '/login' in page.url:
+                print('\n⚠️  Facebook login required!')
+                print('You must be logged into Facebook to scrape Marketplace.')
+                print('Please log in manually in the browser window...')
+                print('After logging in, the scraper will continue automatically.')
+                input('\nPress Enter after you have logged in...')
                 
-                # Check if we see a login form (means not logged in)
-                login_form = page.query_selector('form#login_popup_cta_form')
+                # Reload the page after login
+                await page.goto(search['url'], wait_until='domcontentloaded', timeout=60000)
+                await asyncio.sleep(2)
+            else:
+                print('✓ Already logged into Facebook')
                 
-                if login_form or '/login' in page.url:
-                    print('\n⚠️  Facebook login required!')
-                    print('You must be logged into Facebook to scrape Marketplace.')
-                    print('Please log in manually in the browser window...')
-                    print('After logging in, the scraper will continue automatically.')
-                    input('\nPress Enter after you have logged in...')
-                    
-                    # Reload the page after login
-                    page.goto(search['url'], wait_until='domcontentloaded', timeout=60000)
-                    time.sleep(2)
-                else:
-                    print('✓ Already logged into Facebook')
-                    
-                # Try to close any dismissible popup (the one with X button)
-                try:
-                    close_selectors = [
-                        'div[aria-label="Close"][role="button"]',
-                        'div[aria-label="Fermer"][role="button"]',
-                        'div[aria-label="סגור"][role="button"]'
-                    ]
-                    
-                    for selector in close_selectors:
-                        close_buttons = page.query_selector_all(selector)
-                        for btn in close_buttons:
-                            try:
-                                if btn.is_visible():
-                                    btn.click()
-                                    time.sleep(1)
-                                    print('✓ Closed dismissible popup')
-                                    break
-                            except:
-                                continue
-                except:
-                    pass
-                    
-            except Exception as e:
-                print(f'Note: Could not check login status: {e}')
-            
-            # Find all listings
-            max_scroll = config['scraper_settings'].get('max_scroll', 10)
-            listings = find_marketplace_listings(page, max_scroll=max_scroll)
-            
-            print(f'\nFound {len(listings)} listings to process')
-            
-            # Visit each listing and extract details
-            all_cars = []
-            new_count = 0
-            updated_count = 0
-            unchanged_count = 0
-            filtered_count = 0
-            
-            for i, listing in enumerate(listings, 1):
-                print(f'\n[{i}/{len(listings)}] Processing: {listing["url"]}')
+            # Try to close any dismissible popup (the one with X button)
+            try:
+                close_button = page.locator(CLOSE_POPUP_SEL).first
+                if await close_button.count():
+                    await close_button.click()
+                    await asyncio.sleep(1)
+                    print('✓ Closed dismissible popup')
+            except:
+                pass
                 
-                try:
-                    page.goto(listing['url'], wait_until='domcontentloaded', timeout=60000)
-                    time.sleep(config['scraper_settings'].get('delay_between_requests', 2))
-                    
-                    car = extract_car_details(page, listing['url'])
-                    
-                    # Check if this car existed before
-                    item_id = car['item_id']
-                    car_hash = calculate_car_hash(car)
-                    
-                    if item_id in previous_cars:
-                        prev_car = previous_cars[item_id]
-                        prev_hash = prev_car.get('hash')
-                        
-                        if prev_hash == car_hash:
-                            print(f'  ✓ Unchanged')
-                            unchanged_count += 1
-                            # Keep the old entry with history
-                            all_cars.append(prev_car)
-                        else:
-                            print(f'  📝 Updated')
-                            updated_count += 1
-                            # Add change history
-                            car['hash'] = car_hash
-                            car['first_seen'] = prev_car.get('first_seen', car['scraped_at'])
-                            car['last_updated'] = car['scraped_at']
-                            
-                            if 'change_history' not in prev_car:
-                                prev_car['change_history'] = []
-                            
-                            car['change_history'] = prev_car['change_history'] + [{
-                                'timestamp': car['scraped_at'],
-                                'changes': f"Price: {prev_car.get('price')} → {car.get('price')}"
-                            }]
-                            
-                            all_cars.append(car)
-                    else:
-                        print(f'  ✨ New listing')
-                        new_count += 1
-                        car['hash'] = car_hash
-                        car['first_seen'] = car['scraped_at']
-                        all_cars.append(car)
-                    
-                except Exception as e:
-                    print(f'  ❌ Error processing listing: {e}')
-                    import traceback
-                    traceback.print_exc()
-            
-            # Save results
-            output_data = {
-                'search_name': search['name'],
-                'search_url': search['url'],
-                'last_scraped': datetime.now().isoformat(),
-                'total_cars': len(all_cars),
-                'new_cars': new_count,
-                'updated_cars': updated_count,
-                'unchanged_cars': unchanged_count,
-                'filtered_cars': filtered_count,
-                'cars': all_cars
-            }
+        except Exception as e:
+            print(f'Note: Could not check login status: {e}')
+        
+        # Find all listings
+        max_scroll = settings.get('max_scroll', 10)
+        listings = await find_marketplace_listings(page, max_scroll=max_scroll)
+        
+        print(f'\nFound {len(listings)} listings')
+        
+        # Listings whose search-card preview matches the last run are kept without a visit
+        unchanged_previews = set()
+        for listing in listings:
+            listing['preview_hash'] = calculate_preview_hash(listing)
+            prev_car = previous_cars.get(listing['item_id'])
+            if (listing['price_preview'] is not None and prev_car
+                    and prev_car.get('preview_hash') == listing['preview_hash']):
+                unchanged_previews.add(listing['item_id'])
+        
+        # Listings already extracted by an interrupted run are taken from its progress file
+        progress_file = f'{output_file}.ndjson'
+        resumed = load_progress(progress_file, search['url'])
+        if resumed:
+            print(f'Resuming: {len(resumed)} listings already scraped in {progress_file}')
+        
+        to_visit = [l for l in listings if l['item_id'] not in unchanged_previews and l['item_id'] not in resumed]
+        print(f'{len(unchanged_previews)} unchanged by preview, {len(to_visit)} listings to process')
+        
+        # Persist the (possibly logged-in) session for the listing contexts and future runs
+        storage_state = await context.storage_state(path=state_file)
+        await page.close()
+        
+        # Visit listings concurrently through a fixed pool of tabs, each in its own
+        # context on the shared browser; tabs are recycled rather than recreated
+        # At least one tab, otherwise visit_listing would wait on an empty pool forever
+        concurrency = max(1, settings.get('concurrent_windows', 5))
+        tab_pool = asyncio.Queue()
+        for _ in range(min(concurrency, len(to_visit))):
+            listing_context = await browser.new_context(
+                storage_state=storage_state,
+                viewport={'width': 1280, 'height': 1024}
+            )
+            await listing_context.route("**/*", block_resources)
+            listing_contexts.append(listing_context)
+            tab_pool.put_nowait(await listing_context.new_page())
+        
+        # Pace navigations globally instead of sleeping after every page load. By default
+        # this keeps the old throughput of one request per delay per tab; a zero rate or
+        # delay means no pacing at all.
+        requests_per_second = settings.get('requests_per_second')
+        if requests_per_second is None:
+            delay = settings.get('delay_between_requests', 2)
+            requests_per_second = concurrency / delay if delay else 0
+        request_interval = 1 / requests_per_second if requests_per_second else 0.0
+        next_request_at = 0.0
+        
+        async def wait_for_request_slot():
+            nonlocal next_request_at
+            now = asyncio.get_running_loop().time()
+            slot = max(now, next_request_at)
+            next_request_at = slot + request_interval
+            await asyncio.sleep(slot - now)
+        
+        async def visit_listing(i, listing):
+            listing_page = await tab_pool.get()
+            try:
+                await wait_for_request_slot()
+                print(f'\n[{i}/{len(to_visit)}] Processing: {listing["url"]}')
+                await listing_page.goto(listing['url'], wait_until='domcontentloaded', timeout=60000)
+                car = await extract_car_details(listing_page, listing['url'])
+            finally:
+                tab_pool.put_nowait(listing_page)
+            # Record each listing as soon as it is scraped so a crash loses at most one
+            progress.write(orjson.dumps(car) + b'\n')
+            progress.flush()
+            return car
+        
+        with open(progress_file, 'ab') as progress:
+            if progress.tell() == 0:
+                progress.write(orjson.dumps({'progress_header': {'search_key': search['url'], 'started_at': time.time()}}) + b'\n')
+            scraped = await asyncio.gather(
+                *(visit_listing(i, listing) for i, listing in enumerate(to_visit, 1)),
+                return_exceptions=True
+            )
+        scraped_by_id = dict(resumed)
+        scraped_by_id.update((listing['item_id'], car) for listing, car in zip(to_visit, scraped))
+        
+        all_cars = []
+        new_count = 0
+        updated_count = 0
+        unchanged_count = 0
+        filtered_count = 0
+        
+        # Resolve everything the status logic needs from each previous record up front
+        prev_index = {
+            iid: (c.get('hash'), c.get('first_seen'), c.get('change_history', ()), c.get('price'),
+                  c.get('hash_version'))
+            for iid, c in previous_cars.items()
+        }
+        
+        for listing in listings:
+            if listing['item_id'] in unchanged_previews:
+                print(f'  ✓ Unchanged (preview): {listing["url"]}')
+                unchanged_count += 1
+                all_cars.append(previous_cars[listing['item_id']])
+                continue
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
+            car = scraped_by_id[listing['item_id']]
+            if isinstance(car, Exception):
+                print(f'  ❌ Error processing listing {listing["url"]}: {car}')
+                traceback.print_exception(type(car), car, car.__traceback__)
+                continue
             
-            print(f'\n=== Summary ===')
-            print(f'Total cars: {len(all_cars)}')
-            print(f'New: {new_count}')
-            print(f'Updated: {updated_count}')
-            print(f'Unchanged: {unchanged_count}')
-            print(f'Filtered: {filtered_count}')
-            print(f'\nResults saved to: {output_file}')
+            # Check if this car existed before
+            item_id = car['item_id']
+            car_hash = calculate_car_hash(car)
+            prev = prev_index.get(item_id)
             
-        finally:
-            browser.close()
+            if prev is None:
+                print(f'  ✨ New listing: {listing["url"]}')
+                new_count += 1
+                car['hash'] = car_hash
+                car['hash_version'] = CAR_HASH_VERSION
+                car['preview_hash'] = listing['preview_hash']
+                car['first_seen'] = car['scraped_at']
+                all_cars.append(car)
+            elif prev[4] != CAR_HASH_VERSION:
+                # Hashed by an older scheme: the hashes can't be compared, so keep the
+                # listing's history as is and only store the hash in the current scheme
+                print(f'  ✓ Unchanged (rehashed): {listing["url"]}')
+                unchanged_count += 1
+                prev_car = previous_cars[item_id]
+                car['hash'] = car_hash
+                car['hash_version'] = CAR_HASH_VERSION
+                car['preview_hash'] = listing['preview_hash']
+                car['first_seen'] = prev[1] or car['scraped_at']
+                if 'last_updated' in prev_car:
+                    car['last_updated'] = prev_car['last_updated']
+                car['change_history'] = list(prev[2])
+                all_cars.append(car)
+            elif prev[0] == car_hash:
+                print(f'  ✓ Unchanged: {listing["url"]}')
+                unchanged_count += 1
+                # Keep the old entry with history
+                prev_car = previous_cars[item_id]
+                prev_car['preview_hash'] = listing['preview_hash']
+                all_cars.append(prev_car)
+            else:
+                prev_hash, prev_first_seen, prev_history, prev_price, _ = prev
+                print(f'  📝 Updated: {listing["url"]}')
+                updated_count += 1
+                # Add change history
+                car['hash'] = car_hash
+                car['hash_version'] = CAR_HASH_VERSION
+                car['preview_hash'] = listing['preview_hash']
+                car['first_seen'] = prev_first_seen or car['scraped_at']
+                car['last_updated'] = car['scraped_at']
+                car['change_history'] = list(prev_history) + [{
+                    'timestamp': car['scraped_at'],
+                    'changes': f"Price: {prev_price} → {car.get('price')}"
+                }]
+                all_cars.append(car)
+        
+        # Save results
+        output_data = {
+            'search_name': search['name'],
+            'search_url': search['url'],
+            'last_scraped': datetime.now().isoformat(),
+            'total_cars': len(all_cars),
+            'new_cars': new_count,
+            'updated_cars': updated_count,
+            'unchanged_cars': unchanged_count,
+            'filtered_cars': filtered_count,
+            'cars': all_cars
+        }
+        
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        
+        print(f'\n=== Summary ===')
+        print(f'Total cars: {len(all_cars)}')
+        print(f'New: {new_count}')
+        print(f'Updated: {updated_count}')
+        print(f'Unchanged: {unchanged_count}')
+        print(f'Filtered: {filtered_count}')
+        print(f'\nResults saved to: {output_file}')
+        
+        # Everything is folded into the results file now
+        os.remove(progress_file)
+        
+    finally:
+        await context.close()
+        for listing_context in listing_contexts:
+            await listing_context.close()
 
 
-def main():
+async def main():
     parser = argparse.ArgumentParser(description='Scrape Facebook Marketplace car listings')
     parser.add_argument('--config', default='facebook_config.json', help='Path to config JSON file (default: facebook_config.json)')
     parser.add_argument('--search', help='Specific search name to run (optional)')
     parser.add_argument('--headless', action='store_true', help='Run in headless mode')
+    parser.add_argument('--cdp-endpoint', help='Connect to an already running Chromium over CDP instead of launching one (e.g. http://localhost:9222)')
     
     args = parser.parse_args()
     
@@ -512,15 +672,27 @@ def main():
     
     searches_to_run = [args.search] if args.search else [s['name'] for s in config['searches']]
     
-    for search_name in searches_to_run:
-        output_file = f'cars/facebook-{search_name}.json'
-        scrape_search(
-            config,
-            search_name,
-            output_file,
-            headless=args.headless
-        )
+    async with async_playwright() as p:
+        # One browser is shared by every search instead of relaunching per search
+        if args.cdp_endpoint:
+            print(f'Connecting to browser at {args.cdp_endpoint}...')
+            browser = await p.chromium.connect_over_cdp(args.cdp_endpoint)
+        else:
+            browser_type = config['scraper_settings'].get('browser', 'chromium')
+            browser = await getattr(p, browser_type).launch(headless=args.headless)
+        
+        try:
+            for search_name in searches_to_run:
+                output_file = f'cars/facebook-{search_name}.json'
+                await scrape_search(
+                    config,
+                    search_name,
+                    output_file,
+                    browser
+                )
+        finally:
+            await browser.close()
 
 
 if __name__ == '__main__':
-    main()
+    asyncio.run(main())
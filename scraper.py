@@ -12,80 +12,130 @@ Features:
 - Robust error handling and retries
 """
 import argparse
-import json
+import orjson
+import gzip
+import os
 import time
 import asyncio
 import re
 import hashlib
+import heapq
 from datetime import datetime
 from urllib.parse import urljoin, urlparse, parse_qs
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from difflib import SequenceMatcher
+from collections import Counter, deque
+import xxhash
+import ijson
+
+# Extracted ad pages are cached on disk. Ads already in a search's previous results are
+# handled by the feed-hash shortcut, so the cache only saves page loads for ads that search
+# has no usable record of: ads another search scraped recently, or ads scraped by a run
+# that crashed before writing its results.
+PAGE_CACHE_DIR = os.path.join('.cache', 'ads')
+PAGE_CACHE_TTL = 6 * 60 * 60  # seconds
+
+# Stored on each car next to content_hash; bump when calculate_car_hash changes its fields or
+# encoding. Cars hashed by another scheme (e.g. the old md5-over-JSON hashes, which have no
+# version) are rehashed instead of being reported as updated.
+CAR_HASH_VERSION = 2
+
+# Pooled ad tabs are replaced after this many visits so per-tab renderer memory can't keep growing
+TAB_MAX_VISITS = 50
+
+ITEM_ID_RE = re.compile(r'/item/([a-zA-Z0-9]+)')
+YEAR_RE = re.compile(r'^\d{4}$')
+DIGITS_RE = re.compile(r'\d+')
+NUMBER_RE = re.compile(r'([\d,]+)')
+# Thousands separators and the shekel sign dropped by parse_price in one pass
+PRICE_STRIP_TABLE = str.maketrans('', '', ',₪')
 
 # --- Helper Functions (Ported from scraper.py) ---
 
 def unique_preserve_order(seq):
-    seen = set()
-    out = []
-    for x in seq:
-        if x not in seen:
-            seen.add(x)
-            out.append(x)
-    return out
+    return list(dict.fromkeys(seq))
 
 def extract_item_id(url):
     """Extract the item ID from a URL."""
-    match = re.search(r'/item/([a-zA-Z0-9]+)', url)
+    match = ITEM_ID_RE.search(url)
     return match.group(1) if match else None
 
 def load_config(config_path):
     """Load configuration from JSON file."""
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(config_path, 'rb') as f:
+        return orjson.loads(f.read())
 
-def save_search_to_history(config_path, search_info):
+def save_search_to_history(config_path, search_info, config=None):
     """Save a search to the history at position 1 (prepend to list).
     
     Args:
         config_path: Path to config.json
         search_info: Dict with keys 'manufacturer', 'model', 'year', 'km'
+        config: Already loaded config to update in place (read from config_path if omitted)
     """
     try:
-        config = load_config(config_path)
+        if config is None:
+            config = load_config(config_path)
         
-        # Get existing history or create new
-        last_searches = config.get('last_searches', [])
+        # Get existing history or create new; maxlen keeps only the last 10 searches
+        history = deque(config.get('last_searches', [])[:10], maxlen=10)
         
         # Create search string (e.g., "toyota rav4 2020 80000")
         search_str = f"{search_info['manufacturer']} {search_info['model']} {search_info['year']} {search_info['km']}"
         
         # Remove if already exists (to avoid duplicates)
-        last_searches = [s for s in last_searches if s != search_str]
+        if search_str in history:
+            history.remove(search_str)
         
-        # Prepend to list (add at position 0)
-        last_searches.insert(0, search_str)
+        # Prepend (add at position 0); a full deque drops the oldest search
+        history.appendleft(search_str)
+        last_searches = list(history)
         
-        # Keep only last 10 searches
-        last_searches = last_searches[:10]
+        # Nothing to write if this search is already the most recent one
+        if last_searches == config.get('last_searches'):
+            return
         
         # Update config
         config['last_searches'] = last_searches
         
-        # Save back to file
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        # Save back to file via a temp file so a crash mid-write can't truncate config.json
+        tmp_path = config_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, config_path)
             
     except Exception as e:
         print(f"Warning: Could not save search to history: {e}")
 
-def load_yad2_mapping():
+def load_yad2_mapping(mapping_path='yad2_mapping.json'):
     """Load the Yad2 manufacturer/model mapping data."""
     try:
-        with open('yad2_mapping.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(mapping_path, 'rb') as f:
+            mapping_data = orjson.loads(f.read())
     except FileNotFoundError:
-        print("Warning: yad2_mapping.json not found. Names and filters will not be auto-generated.")
+        print(f"Warning: {mapping_path} not found. Names and filters will not be auto-generated.")
         return None
+    # Lowercase every English name once so the matching loops don't redo it per query,
+    # and record the longest name (in tokens) so parse_search_input can bound its spans.
+    # Exact-name indexes map both the lowercased English and the Hebrew name to the first
+    # entry with that name, so exact matches are a dict lookup instead of a scan.
+    manufacturers = mapping_data.get('manufacturers', {})
+    manufacturer_ids = {}
+    for mfr_id, mfr_info in manufacturers.items():
+        mfr_info['_name_en_lc'] = mfr_info.get('name_en', '').lower()
+        manufacturer_ids.setdefault(mfr_info['_name_en_lc'], mfr_id)
+        manufacturer_ids.setdefault(mfr_info.get('name_he', ''), mfr_id)
+        models = mfr_info.get('models', {})
+        model_ids = {}
+        for model_id, model_info in models.items():
+            model_info['_name_en_lc'] = model_info.get('name_en', '').lower()
+            model_ids.setdefault(model_info['_name_en_lc'], model_id)
+            model_ids.setdefault(model_info.get('name_he', ''), model_id)
+        mfr_info['_model_ids'] = model_ids
+        mfr_info['_max_model_tokens'] = max((len(m['_name_en_lc'].split()) for m in models.values()), default=1)
+    mapping_data['_manufacturer_ids'] = manufacturer_ids
+    mapping_data['_max_manufacturer_tokens'] = max((len(m['_name_en_lc'].split()) for m in manufacturers.values()), default=1)
+    return mapping_data
 
 def extract_url_params(url):
     parsed = urlparse(url)
@@ -140,6 +190,18 @@ def enrich_search_config(search_config, mapping_data):
         search_config['filters']['title_must_contain'] = [vehicle_info['manufacturer_he']]
     return search_config
 
+def name_similarity(a, b, score_cutoff=0.0):
+    """SequenceMatcher similarity ratio in [0, 1].
+
+    Ratios below score_cutoff are reported as 0, which lets the cheap upper-bound ratios
+    rule a pair out before the full ratio is computed.
+    """
+    matcher = SequenceMatcher(None, a, b)
+    if matcher.real_quick_ratio() < score_cutoff or matcher.quick_ratio() < score_cutoff:
+        return 0.0
+    ratio = matcher.ratio()
+    return ratio if ratio >= score_cutoff else 0.0
+
 def find_closest_matches(query, options_dict, top_n=5):
     """Find closest matches using fuzzy string matching.
     
@@ -153,28 +215,29 @@ def find_closest_matches(query, options_dict, top_n=5):
     """
     matches = []
     query_lower = query.lower().strip()
+    # Slicing past the end is safe, so the 3-char prefixes need no length clamp
+    query_prefix = query_lower[:3]
     
     for id_key, info in options_dict.items():
-        name_en = info.get('name_en', '').lower()
+        name_en = info['_name_en_lc']
         name_he = info.get('name_he', '')
         
         # Calculate similarity with English name using multiple methods
         # Method 1: Overall similarity
-        similarity = SequenceMatcher(None, query_lower, name_en).ratio()
+        similarity = name_similarity(query_lower, name_en)
         
         # Method 2: Check if query is substring or vice versa (boost score)
-        if query_lower in name_en or name_en in query_lower:
-            similarity = max(similarity, 0.7)
+        if similarity < 0.7 and (query_lower in name_en or name_en in query_lower):
+            similarity = 0.7
         
         # Method 3: Check if query starts with name or vice versa (boost score)
-        if query_lower.startswith(name_en[:min(3, len(name_en))]) or name_en.startswith(query_lower[:min(3, len(query_lower))]):
-            similarity = max(similarity, 0.6)
+        if similarity < 0.6 and (query_lower.startswith(name_en[:3]) or name_en.startswith(query_prefix)):
+            similarity = 0.6
         
         matches.append((id_key, info.get('name_en', ''), name_he, similarity))
     
-    # Sort by similarity score (descending)
-    matches.sort(key=lambda x: x[3], reverse=True)
-    return matches[:top_n]
+    # Only the top few are shown, so select them without sorting every option
+    return heapq.nlargest(top_n, matches, key=lambda x: x[3])
 
 def select_manufacturer_interactive(mapping_data):
     """Interactive manufacturer selection with fuzzy matching.
@@ -201,13 +264,12 @@ def select_manufacturer_interactive(mapping_data):
         return None
     
     # Try exact match first (case-insensitive)
-    manufacturer_input_lower = manufacturer_input.lower()
     exact_match = None
-    for mfr_id, mfr_info in manufacturers.items():
-        if (mfr_info.get('name_en', '').lower() == manufacturer_input_lower or 
-            mfr_info.get('name_he', '') == manufacturer_input):
-            exact_match = (mfr_id, mfr_info.get('name_en'), mfr_info.get('name_he'))
-            break
+    mfr_id = (mapping_data['_manufacturer_ids'].get(manufacturer_input.lower())
+              or mapping_data['_manufacturer_ids'].get(manufacturer_input))
+    if mfr_id:
+        mfr_info = manufacturers[mfr_id]
+        exact_match = (mfr_id, mfr_info.get('name_en'), mfr_info.get('name_he'))
     
     if exact_match:
         print(f"✓ Found exact match: {exact_match[1]} ({exact_match[2]})")
@@ -272,13 +334,12 @@ def select_model_interactive(manufacturer_id, manufacturer_name, mapping_data):
         return None
     
     # Try exact match first (case-insensitive)
-    model_input_lower = model_input.lower()
     exact_match = None
-    for model_id, model_info in models.items():
-        if (model_info.get('name_en', '').lower() == model_input_lower or 
-            model_info.get('name_he', '') == model_input):
-            exact_match = (model_id, model_info.get('name_en'), model_info.get('name_he'))
-            break
+    model_id = (manufacturer_info['_model_ids'].get(model_input.lower())
+                or manufacturer_info['_model_ids'].get(model_input))
+    if model_id:
+        model_info = models[model_id]
+        exact_match = (model_id, model_info.get('name_en'), model_info.get('name_he'))
     
     if exact_match:
         print(f"✓ Found exact match: {exact_match[1]} ({exact_match[2]})")
@@ -378,27 +439,33 @@ def parse_search_input(user_input, mapping_data):
     
     # Try to match manufacturer and model from all tokens (including numeric ones that might be model names)
     if tokens:
+        # Per-token lowercase text and digits, computed once instead of per span
+        tokens_lc = [t.lower() for t in tokens]
+        token_digits = [t.replace(',', '') for t in tokens]
+        token_is_numeric = [d.isdigit() for d in token_digits]
+        
         best_manufacturer_match = None
         best_manufacturer_score = 0
         best_manufacturer_token_count = 0
         
-        # Try single tokens and combinations for manufacturer
+        # Try single tokens and combinations for manufacturer, no longer than the longest name
+        max_tokens = mapping_data['_max_manufacturer_tokens']
         for i in range(len(tokens)):
-            for j in range(i + 1, len(tokens) + 1):
-                candidate = ' '.join(tokens[i:j]).lower()
+            for j in range(i + 1, min(len(tokens), i + max_tokens) + 1):
+                candidate = ' '.join(tokens_lc[i:j])
                 # Skip pure numbers that are likely year/km
-                if candidate.replace(',', '').replace(' ', '').isdigit():
-                    num = int(candidate.replace(',', '').replace(' ', ''))
+                if all(token_is_numeric[i:j]):
+                    num = int(''.join(token_digits[i:j]))
                     if num >= 1900:  # Skip likely year or km values
                         continue
                 
                 for mfr_id, mfr_info in manufacturers.items():
-                    mfr_name = mfr_info.get('name_en', '').lower()
+                    mfr_name = mfr_info['_name_en_lc']
                     if not mfr_name:
                         continue
                     
-                    # Use SequenceMatcher for similarity
-                    score = SequenceMatcher(None, candidate, mfr_name).ratio()
+                    # Only a ratio that can reach the current best matters; boosts below cover the rest
+                    score = name_similarity(candidate, mfr_name, best_manufacturer_score)
                     
                     # Boost score for substring matches
                     if candidate in mfr_name or mfr_name in candidate:
@@ -422,6 +489,9 @@ def parse_search_input(user_input, mapping_data):
             
             # Remove matched manufacturer tokens and try to find model
             remaining_tokens = tokens[:start_idx] + tokens[end_idx:]
+            remaining_lc = tokens_lc[:start_idx] + tokens_lc[end_idx:]
+            remaining_digits = token_digits[:start_idx] + token_digits[end_idx:]
+            remaining_is_numeric = token_is_numeric[:start_idx] + token_is_numeric[end_idx:]
             
             if remaining_tokens:
                 models = mfr_info.get('models', {})
@@ -429,24 +499,24 @@ def parse_search_input(user_input, mapping_data):
                 best_model_score = 0
                 
                 # Try combinations for model (including numeric models like "3008")
+                max_tokens = mfr_info['_max_model_tokens']
                 for i in range(len(remaining_tokens)):
-                    for j in range(i + 1, len(remaining_tokens) + 1):
-                        candidate = ' '.join(remaining_tokens[i:j]).lower()
+                    for j in range(i + 1, min(len(remaining_tokens), i + max_tokens) + 1):
+                        candidate = ' '.join(remaining_lc[i:j])
                         
                         # Skip if this looks like year (1900-2030)
-                        if candidate.replace(',', '').replace(' ', '').isdigit():
-                            num = int(candidate.replace(',', '').replace(' ', ''))
+                        if all(remaining_is_numeric[i:j]):
+                            num = int(''.join(remaining_digits[i:j]))
                             if 1900 <= num <= 2030:
                                 continue
                             # For other numbers, allow them as potential model names (e.g., "3008", "500")
                         
                         for model_id, model_info in models.items():
-                            model_name = model_info.get('name_en', '').lower()
+                            model_name = model_info['_name_en_lc']
                             if not model_name:
                                 continue
                             
-                            # Use SequenceMatcher for similarity
-                            score = SequenceMatcher(None, candidate, model_name).ratio()
+                            score = name_similarity(candidate, model_name, best_model_score)
                             
                             # Boost score for substring matches
                             if candidate in model_name or model_name in candidate:
@@ -508,18 +578,19 @@ def interactive_search_mode(mapping_data):
     fuzzy_confirm = False
     fuzzy_manufacturer = None
     fuzzy_model = None
+    search_input_lc = search_input.lower()
     # Check manufacturer fuzzy match
     if parsed['manufacturer']:
         manu_name = parsed['manufacturer'][1]
         # If input doesn't match exactly, ask for confirmation
-        if manu_name.lower() not in search_input.lower():
+        if manu_name.lower() not in search_input_lc:
             fuzzy_confirm = True
             fuzzy_manufacturer = manu_name
         print(f"✓ Manufacturer: {manu_name}")
         detected_any = True
     if parsed['model']:
         model_name = parsed['model'][1]
-        if model_name.lower() not in search_input.lower():
+        if model_name.lower() not in search_input_lc:
             fuzzy_confirm = True
             fuzzy_model = model_name
         print(f"✓ Model: {model_name}")
@@ -675,138 +746,275 @@ def interactive_search_mode(mapping_data):
     return search_config
 
 def load_previous_results(output_file):
+    """Load previous results one car at a time so large files are never fully in memory."""
     try:
-        with open(output_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if isinstance(data, dict) and 'cars' in data:
-                cars = data['cars']
-            elif isinstance(data, list):
-                cars = data
+        with open(output_file, 'rb') as f:
+            # Output files are either {"cars": [...]} or a bare list
+            first = f.read(1)
+            while first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            if first == b'{':
+                prefix = 'cars.item'
+            elif first == b'[':
+                prefix = 'item'
             else:
-                cars = []
-            return {car['item_id']: car for car in cars if 'item_id' in car}
+                return {}
+            results = {}
+            for car in ijson.items(f, prefix, use_float=True):
+                if 'item_id' in car:
+                    results[car['item_id']] = car
+            return results
     except FileNotFoundError:
         return {}
 
+def cache_path_for(url):
+    """Return the page cache file for an ad URL."""
+    return os.path.join(PAGE_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + '.json.gz')
+
+def load_cached_details(url, feed_hash):
+    """Return cached car details for a URL, or None if missing, expired or cached for a different feed card.
+    
+    Expired entries are deleted as they are found.
+    """
+    path = cache_path_for(url)
+    try:
+        if time.time() - os.path.getmtime(path) > PAGE_CACHE_TTL:
+            os.remove(path)
+            return None
+        with gzip.open(path, 'rb') as f:
+            entry = orjson.loads(f.read())
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+    # Any change on the feed card (title, price, year, hand, seller) means the ad changed
+    if not isinstance(entry, dict) or entry.get('feed_hash') != feed_hash:
+        return None
+    return entry.get('details')
+
+def save_cached_details(url, details, feed_hash):
+    """Store extracted car details for a URL in the page cache, tagged with its feed card hash."""
+    try:
+        os.makedirs(PAGE_CACHE_DIR, exist_ok=True)
+        with gzip.open(cache_path_for(url), 'wb') as f:
+            f.write(orjson.dumps({'feed_hash': feed_hash, 'details': details}))
+    except OSError as e:
+        print(f"Warning: Could not cache {url}: {e}")
+
+def prune_page_cache():
+    """Delete page cache entries older than the TTL so the cache directory can't grow forever."""
+    cutoff = time.time() - PAGE_CACHE_TTL
+    try:
+        entries = list(os.scandir(PAGE_CACHE_DIR))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+def new_field_hasher():
+    """Return the fast non-cryptographic hasher (xxh3) used for all stored hashes.
+    
+    There is deliberately no fallback: a different algorithm would make every stored
+    hash mismatch and report every car as changed.
+    """
+    return xxhash.xxh3_64()
+
 def calculate_car_hash(car):
-    important_fields = {
-        'price': car.get('price'),
-        'mileage': car.get('mileage'),
-        'description': car.get('description'),
-        'location': car.get('location'),
-    }
-    hash_str = json.dumps(important_fields, sort_keys=True, ensure_ascii=False)
-    return hashlib.md5(hash_str.encode()).hexdigest()
+    h = new_field_hasher()
+    for field in ('price', 'mileage', 'description', 'location'):
+        value = car.get(field)
+        h.update(b'\x00' if value is None else str(value).encode('utf-8'))
+        h.update(b'\x1f')  # Field separator so adjacent values cannot run together
+    return h.hexdigest()
+
+def calculate_feed_hash(item):
+    """Hash the fields shown on the feed card; if they match the last run the ad is not revisited."""
+    h = new_field_hasher()
+    for field in ('title', 'price', 'year', 'hand', 'is_private'):
+        h.update(str(item.get(field)).encode('utf-8'))
+        h.update(b'\x1f')
+    return h.hexdigest()
 
 def parse_price(price_str):
     if not price_str:
         return None
-    match = re.search(r'([\d,]+)', price_str.replace(',', ''))
+    cleaned = price_str.translate(PRICE_STRIP_TABLE).strip()
+    # Prices are usually just "150,000 ₪", so skip the regex when only digits are left
+    if cleaned.isdecimal():
+        return int(cleaned)
+    match = NUMBER_RE.search(cleaned)
     return int(match.group(1)) if match else None
 
 # --- Async Scraper Logic ---
 
-async def block_resources(route):
-    """Block images, fonts, and media to speed up loading."""
-    if route.request.resource_type in ["image", "media", "font", "stylesheet"]:
-        await route.abort()
-    else:
-        await route.continue_()
+# Selectors that mark a feed page or ad page as ready to extract
+FEED_READY_SEL = 'a[href*="item/"] [data-testid="feed-item-info"]'
+AD_READY_SEL = '.details-item_detailsItemBox__blPEY, span[data-testid="price"]'
+
+# Ad page text fields, each read from the first selector that has non-empty text
+AD_TEXT_SELECTORS = {
+    'title': ['h1.heading_heading__6RE1P', 'h1[data-nagish="upper-heading-title"]', 'h1'],
+    'marketing_name': ['h2.marketing-name_marketingName__VoALw', 'h2[data-nagish="name-section-title"]'],
+    'location': ['span.location_location__r6h8_', 'span[data-testid="location"]'],
+    'description': ['p.description_description__xxZXs', '.description', '[data-testid="description"]'],
+}
+
+# Returns the raw text of every feed card that has item info
+FEED_ITEMS_JS = """
+() => Array.from(document.querySelectorAll('a[href*="item/"]'))
+    .filter((a) => a.querySelector('[data-testid="feed-item-info"]'))
+    .map((a) => {
+        const text = (sel) => {
+            const el = a.querySelector(sel);
+            return el ? (el.textContent || '').trim() : null;
+        };
+        return {
+            href: a.getAttribute('href'),
+            title: text('.feed-item-info-section_heading__Bp32t'),
+            price: text('.price_price__xQt90'),
+            year_hand: text('.feed-item-info-section_yearAndHandBox__H5oQ0'),
+            has_private_tags: !!a.querySelector('.private-item_tags__BaT6z'),
+            has_agency_name: !!a.querySelector('.feed-item-image-section_agencyName__U_wJp'),
+        };
+    })
+"""
 
-async def extract_first_text(page, selectors):
-    for sel in selectors:
-        el = await page.query_selector(sel)
-        if el:
-            text = await el.text_content()
-            if text and text.strip():
-                return text.strip()
-    return None
+# Returns the raw text of every field extract_car_details_async needs from a car page
+CAR_DETAILS_JS = """
+(textSelectors) => {
+    const firstText = (selectors) => {
+        for (const sel of selectors) {
+            const el = document.querySelector(sel);
+            const text = el ? (el.textContent || '').trim() : '';
+            if (text) return text;
+        }
+        return null;
+    };
+    const textOf = (el) => (el.textContent || '').trim();
+
+    // Prefer the finance box price, then the ad price, then any non-monthly price
+    let price = null;
+    for (const sel of ['.car-finance_priceBox__VuZk3 span[data-testid="price"]',
+                       '.ad-price_price__9rK1w span[data-testid="price"]']) {
+        const el = document.querySelector(sel);
+        if (el) price = textOf(el);
+        if (price) break;
+    }
+    if (!price) {
+        // Skip monthly-payment prices by checking the grandparent and its subtree for a
+        // monthlyPayment class, test id or id, and its text for 'לחודש', instead of
+        // serializing the whole subtree with outerHTML
+        const monthlySel = '[class*="monthlyPayment"], [data-testid*="monthlyPayment"], [id*="monthlyPayment"]';
+        const el = Array.from(document.querySelectorAll('span[data-testid="price"]')).find((p) => {
+            const box = p.parentElement && p.parentElement.parentElement;
+            if (!box) return true;
+            const monthly = box.matches(monthlySel) || box.querySelector(monthlySel);
+            return !monthly && !(box.textContent || '').includes('לחודש');
+        });
+        if (el) price = textOf(el);
+    }
+
+    // Spec table labels and values are sibling lists; zip them into one object here
+    const specValues = document.querySelectorAll('dt.item-detail_value__QHPml');
+    const specs = {};
+    document.querySelectorAll('dd.item-detail_label__FnhAu').forEach((label, i) => {
+        if (i < specValues.length) specs[textOf(label)] = textOf(specValues[i]);
+    });
+
+    const texts = {};
+    for (const [field, selectors] of Object.entries(textSelectors)) texts[field] = firstText(selectors);
+
+    return {
+        texts: texts,
+        price: price,
+        detail_items: Array.from(document.querySelectorAll('.details-item_detailsItemBox__blPEY'),
+            (el) => ({text: textOf(el), has_svg: !!el.querySelector('svg')})),
+        specs: specs,
+    };
+}
+"""
+
+# Routes use regex URL patterns, which Playwright matches inside the browser driver, so
+# only requests that are about to be blocked ever reach Python. Keep them JS-compatible.
+# Third-party ad/analytics hosts the scraper never needs
+TRACKER_URL_RE = re.compile(r'^[a-z]+://[^/?#]*(googletagmanager|google-analytics|doubleclick|googlesyndication|facebook|hotjar|braze)', re.I)
+# Images and video, which no extraction reads
+MEDIA_URL_RE = re.compile(r'\.(png|jpe?g|gif|webp|avif|svg|ico|mp4|webm)(\?|$)', re.I)
+# Media plus fonts and stylesheets, dropped on ad pages
+ASSET_URL_RE = re.compile(r'\.(png|jpe?g|gif|webp|avif|svg|ico|mp4|webm|woff2?|ttf|otf|css)(\?|$)', re.I)
+
+async def block_request(route):
+    """Abort a request matched by one of the blocking URL patterns."""
+    await route.abort()
+
+async def open_ad_tab(context):
+    """Open a pooled ad-page tab with static assets blocked."""
+    page = await context.new_page()
+    await page.route(ASSET_URL_RE, block_request)
+    return {'page': page, 'visits': 0}
+
+async def release_ad_tab(tab_pool, tab):
+    """Return a tab to the pool, swapping it for a fresh one once it has been used enough."""
+    tab['visits'] += 1
+    if tab['visits'] >= TAB_MAX_VISITS:
+        old_page = tab['page']
+        try:
+            tab = await open_ad_tab(old_page.context)
+            await old_page.close()
+        except Exception:
+            # Context is going away (e.g. CAPTCHA restart); the old tab is discarded with it
+            pass
+    tab_pool.put_nowait(tab)
 
 async def extract_car_details_async(page, url):
     """Extract details from a single car page (async)."""
     try:
-        # Wait for key elements
+        # Ad pages are navigated with wait_until='commit': wait for the details box or price,
+        # then for the rest of the document, so the single evaluate never sees a half-parsed page
         try:
-            await page.wait_for_load_state('domcontentloaded', timeout=30000)
-        except:
+            await page.wait_for_selector(AD_READY_SEL, timeout=15000)
+        except PlaywrightTimeoutError:
             pass
+        await page.wait_for_load_state('domcontentloaded')
         
-        # Main title
-        title = await extract_first_text(page, [
-            'h1.heading_heading__6RE1P',
-            'h1[data-nagish="upper-heading-title"]',
-            'h1',
-        ])
-
-        # Marketing name
-        marketing_name = await extract_first_text(page, [
-            'h2.marketing-name_marketingName__VoALw',
-            'h2[data-nagish="name-section-title"]',
-        ])
-
-        # Price
-        price = None
-        car_finance_price = await page.query_selector('.car-finance_priceBox__VuZk3 span[data-testid="price"]')
-        if car_finance_price:
-            price = (await car_finance_price.text_content()).strip()
+        # Read all raw fields in a single round-trip; parsing stays in Python
+        raw = await page.evaluate(CAR_DETAILS_JS, AD_TEXT_SELECTORS)
         
-        if not price:
-            ad_price = await page.query_selector('.ad-price_price__9rK1w span[data-testid="price"]')
-            if ad_price:
-                price = (await ad_price.text_content()).strip()
+        title = raw['texts']['title']
+        marketing_name = raw['texts']['marketing_name']
+        price = raw['price']
+        location = raw['texts']['location']
+        description = raw['texts']['description']
         
-        if not price:
-            all_prices = await page.query_selector_all('span[data-testid="price"]')
-            for price_el in all_prices:
-                parent_html = await price_el.evaluate('el => el.parentElement.parentElement.outerHTML')
-                if 'monthlyPayment' not in parent_html and 'לחודש' not in parent_html:
-                    price = (await price_el.text_content()).strip()
-                    break
-
-        # Location
-        location = await extract_first_text(page, [
-            'span.location_location__r6h8_',
-            'span[data-testid="location"]',
-        ])
-
-        # Description
-        description = await extract_first_text(page, [
-            'p.description_description__xxZXs',
-            '.description',
-            '[data-testid="description"]',
-        ])
+        # Nothing usable on the page (removed ad, error or challenge page); don't let it be cached
+        if not title and not price:
+            return None
 
         # Details (Year, Hand, Mileage)
         year = None
         hand = None
         mileage = None
         
-        detail_items = await page.query_selector_all('.details-item_detailsItemBox__blPEY')
-        for item in detail_items:
-            text = (await item.text_content()).strip()
-            if await item.query_selector('svg') and re.match(r'^\d{4}$', text):
+        for item in raw['detail_items']:
+            text = item['text']
+            if item['has_svg'] and YEAR_RE.match(text):
                 year = text
             elif 'יד' in text:
-                hand_match = re.search(r'(\d+)', text)
+                hand_match = DIGITS_RE.search(text)
                 if hand_match:
-                    hand = hand_match.group(1)
+                    hand = hand_match.group()
             elif 'ק"מ' in text or 'קמ' in text:
-                mileage_match = re.search(r'([\d,]+)', text)
+                mileage_match = NUMBER_RE.search(text)
                 if mileage_match:
                     mileage = mileage_match.group(1)
 
         # Specs
-        specs = {}
-        spec_labels = await page.query_selector_all('dd.item-detail_label__FnhAu')
-        spec_values = await page.query_selector_all('dt.item-detail_value__QHPml')
-        
-        for i, label_el in enumerate(spec_labels):
-            if i < len(spec_values):
-                label = (await label_el.text_content()).strip()
-                value = (await spec_values[i].text_content()).strip()
-                specs[label] = value
-                if not mileage and 'קילומטר' in label:
-                    mileage = value
+        specs = raw['specs']
+        if not mileage:
+            mileage = next((value for label, value in specs.items() if 'קילומטר' in label), None)
         
         return {
             'url': url,
@@ -825,375 +1033,385 @@ async def extract_car_details_async(page, url):
         print(f"Error extracting details for {url}: {e}")
         return None
 
-async def process_item(context, item, semaphore, previous_results, current_timestamp, is_first_run):
-    """Process a single item with concurrency control."""
-    async with semaphore:
-        item_id = extract_item_id(item['url'])
-        
-        # Check if already scraped in this session (handled by caller, but good double check)
-        # Check if exists in previous results
-        if item_id in previous_results:
-            old_car = previous_results[item_id]
-            # We still need to visit to check for updates, but we can potentially skip if we trust the feed data
-            # For now, let's visit to ensure we get the latest mileage/price
-            pass
-
-        page = await context.new_page()
-        # Block resources
-        await page.route("**/*", block_resources)
-        
-        try:
-            print(f"    Visiting {item['url']}...")
-            await page.goto(item['url'], wait_until='domcontentloaded', timeout=60000)
+def is_captcha_url(url):
+    """True if the page was redirected to the bot-protection challenge."""
+    return 'validate.perfdrive.com' in url or 'perimeterx' in url.lower()
+
+def describe_car(car):
+    """One-line summary used in the per-car status output."""
+    marketing_name = car.get('marketing_name') or car.get('title', 'N/A')
+    return f"{marketing_name} | {car.get('year', 'N/A')} | {car.get('mileage', 'N/A')} km | {car.get('price_str', 'N/A')} | {car.get('location', 'N/A')}"
+
+async def process_item(tab_pool, item, previous_results, current_timestamp, is_first_run):
+    """Process a single item, borrowing a tab from the pool only when the ad must be visited."""
+    item_id = item['item_id']
+    feed_hash = calculate_feed_hash(item)
+    feed_price = item.get('price')
+
+    # Ads whose feed card is unchanged since the last run are kept as they are
+    old_car = previous_results.get(item_id)
+    if (feed_price is not None and old_car and old_car.get('status') != 'removed'
+            and old_car.get('feed_hash') == feed_hash):
+        old_car['status'] = 'active'
+        print(f"  ✓ Active (feed unchanged): {describe_car(old_car)}")
+        return {'success': True, 'car': old_car}
+    
+    # Ads with no usable previous record (seen by another search, or by a run that crashed
+    # before saving) are served from the page cache if their feed card hasn't changed
+    car_details = load_cached_details(item['url'], feed_hash)
+    
+    try:
+        if car_details:
+            print(f"    Using cached page for {item['url']}")
+        else:
+            tab = await tab_pool.get()
+            page = tab['page']
+            try:
+                print(f"    Visiting {item['url']}...")
+                # Return once the response is committed; extraction waits for the page content itself
+                await page.goto(item['url'], wait_until='commit', timeout=30000)
+                
+                # Check for CAPTCHA: server redirects show up right away, script-driven ones
+                # only after the waits in extraction, so check again afterwards
+                if is_captcha_url(page.url):
+                    print(f"⚠️  CAPTCHA detected on {item['url']}")
+                    return {'error': 'CAPTCHA', 'item': item}
+
+                car_details = await extract_car_details_async(page, item['url'])
+                if is_captcha_url(page.url):
+                    print(f"⚠️  CAPTCHA detected on {item['url']}")
+                    return {'error': 'CAPTCHA', 'item': item}
+            finally:
+                await release_ad_tab(tab_pool, tab)
             
-            # Check for CAPTCHA
-            if 'validate.perfdrive.com' in page.url or 'perimeterx' in page.url.lower():
-                print(f"⚠️  CAPTCHA detected on {item['url']}")
-                await page.close()
-                return {'error': 'CAPTCHA', 'item': item}
-
-            car_details = await extract_car_details_async(page, item['url'])
-            await page.close()
+            if car_details:
+                save_cached_details(item['url'], car_details, feed_hash)
 
-            if not car_details:
-                return {'error': 'Extraction failed', 'item': item}
+        if not car_details:
+            return {'error': 'Extraction failed', 'item': item}
 
-            # Merge feed data with page data (page data takes precedence)
-            car = car_details
-            car['item_id'] = item_id
-            
-            # Use feed data if page data is missing
-            if not car['year'] and item.get('year'): car['year'] = item['year']
-            if not car['hand'] and item.get('hand'): car['hand'] = item['hand']
-            if not car['price'] and item.get('price'): car['price'] = item['price']
-            
-            # Status logic
-            if item_id in previous_results:
-                old_car = previous_results[item_id]
-                old_hash = old_car.get('content_hash')
-                new_hash = calculate_car_hash(car)
-                
-                if old_hash != new_hash:
-                    car['status'] = 'updated'
-                    car['last_update'] = current_timestamp
-                    car['first_seen'] = old_car.get('first_seen', current_timestamp)
-                    car['update_count'] = old_car.get('update_count', 0) + 1
-                    year = car.get('year', 'N/A')
-                    mileage = car.get('mileage', 'N/A')
-                    price = car.get('price_str', 'N/A')
-                    location = car.get('location', 'N/A')
-                    marketing_name = car.get('marketing_name') or car.get('title', 'N/A')
-                    print(f"  ↻ Updated: {marketing_name} | {year} | {mileage} km | {price} | {location}")
-                else:
-                    car['status'] = 'active'
-                    car['last_update'] = old_car.get('last_update', current_timestamp)
-                    car['first_seen'] = old_car.get('first_seen', current_timestamp)
-                    car['update_count'] = old_car.get('update_count', 0)
-                    year = car.get('year', 'N/A')
-                    mileage = car.get('mileage', 'N/A')
-                    price = car.get('price_str', 'N/A')
-                    location = car.get('location', 'N/A')
-                    marketing_name = car.get('marketing_name') or car.get('title', 'N/A')
-                    print(f"  ✓ Active: {marketing_name} | {year} | {mileage} km | {price} | {location}")
-                car['content_hash'] = new_hash
-            else:
-                year = car.get('year', 'N/A')
-                mileage = car.get('mileage', 'N/A')
-                price = car.get('price_str', 'N/A')
-                location = car.get('location', 'N/A')
-                marketing_name = car.get('marketing_name') or car.get('title', 'N/A')
-                if is_first_run:
-                    car['status'] = 'active'
-                    print(f"  ✓ Active (First Run): {marketing_name} | {year} | {mileage} km | {price} | {location}")
-                else:
-                    car['status'] = 'new'
-                    print(f"  ★ New: {marketing_name} | {year} | {mileage} km | {price} | {location}")
-                car['first_seen'] = current_timestamp
+        # Merge feed data with page data (page data takes precedence)
+        car = car_details
+        car['item_id'] = item_id
+        car['feed_hash'] = feed_hash
+        
+        # Use feed data if page data is missing
+        if not car['year'] and item.get('year'): car['year'] = item['year']
+        if not car['hand'] and item.get('hand'): car['hand'] = item['hand']
+        if not car['price'] and feed_price: car['price'] = feed_price
+        
+        # Status logic
+        content_hash = calculate_car_hash(car)
+        if old_car is not None:
+            car['first_seen'] = old_car.get('first_seen', current_timestamp)
+            update_count = old_car.get('update_count', 0)
+            # Hashes from another scheme can't be compared, so such cars are only rehashed
+            if old_car.get('hash_version') == CAR_HASH_VERSION and old_car.get('content_hash') != content_hash:
+                car['status'] = 'updated'
                 car['last_update'] = current_timestamp
-                car['update_count'] = 0
-                car['content_hash'] = calculate_car_hash(car)
+                car['update_count'] = update_count + 1
+                print(f"  ↻ Updated: {describe_car(car)}")
+            else:
+                car['status'] = 'active'
+                car['last_update'] = old_car.get('last_update', current_timestamp)
+                car['update_count'] = update_count
+                print(f"  ✓ Active: {describe_car(car)}")
+        else:
+            if is_first_run:
+                car['status'] = 'active'
+                print(f"  ✓ Active (First Run): {describe_car(car)}")
+            else:
+                car['status'] = 'new'
+                print(f"  ★ New: {describe_car(car)}")
+            car['first_seen'] = current_timestamp
+            car['last_update'] = current_timestamp
+            car['update_count'] = 0
+        car['content_hash'] = content_hash
+        car['hash_version'] = CAR_HASH_VERSION
 
-            return {'success': True, 'car': car}
+        return {'success': True, 'car': car}
 
-        except Exception as e:
-            print(f"Error processing {item['url']}: {e}")
-            await page.close()
-            return {'error': str(e), 'item': item}
+    except Exception as e:
+        print(f"Error processing {item['url']}: {e}")
+        return {'error': str(e), 'item': item}
 
 async def find_ad_links_async(page):
     """Extract ad links from the feed page."""
-    results = []
+    # Keyed by URL: dict insertion order keeps the first card for each ad
+    results = {}
     # Wait for feed items
     try:
-        await page.wait_for_selector('a[href*="item/"]', timeout=10000)
+        await page.wait_for_selector(FEED_READY_SEL, timeout=10000)
     except:
         print("No items found on this page.")
         return []
 
-    all_links = await page.query_selector_all('a[href*="item/"]')
+    # Read every feed card in a single round-trip; parsing stays in Python
+    cards = await page.evaluate(FEED_ITEMS_JS)
     
-    for link in all_links:
-        has_feed_info = await link.query_selector('[data-testid="feed-item-info"]')
-        if has_feed_info:
-            href = await link.get_attribute('href')
-            if not href or 'item/' not in href: continue
-            
-            full_href = urljoin(page.url, href)
-            
-            title_el = await link.query_selector('.feed-item-info-section_heading__Bp32t')
-            title = (await title_el.text_content()).strip() if title_el else 'N/A'
-            
-            price_el = await link.query_selector('.price_price__xQt90')
-            price_text = (await price_el.text_content()).strip() if price_el else None
-            price = parse_price(price_text)
-            
-            year = None
-            hand = None
-            year_hand_el = await link.query_selector('.feed-item-info-section_yearAndHandBox__H5oQ0')
-            if year_hand_el:
-                yh_text = (await year_hand_el.text_content()).strip()
-                parts = yh_text.split('•')
-                if len(parts) >= 1 and parts[0].strip().isdigit():
-                    year = int(parts[0].strip())
-                if len(parts) >= 2:
-                    hand_match = re.search(r'\d+', parts[1])
-                    if hand_match:
-                        hand = int(hand_match.group())
-
-            is_private = False
-            has_private_tags = await link.query_selector('.private-item_tags__BaT6z')
-            has_agency_name = await link.query_selector('.feed-item-image-section_agencyName__U_wJp')
-            if has_private_tags and not has_agency_name:
-                is_private = True
-
-            results.append({
-                'url': full_href,
-                'title': title,
-                'price': price,
-                'year': year,
-                'hand': hand,
-                'is_private': is_private
-            })
-            
-    # Deduplicate
-    seen = set()
-    unique_results = []
-    for item in results:
-        if item['url'] not in seen:
-            seen.add(item['url'])
-            unique_results.append(item)
+    for card in cards:
+        href = card['href']
+        if not href or 'item/' not in href: continue
+        
+        full_href = urljoin(page.url, href)
+        if full_href in results: continue
+        
+        title = card['title'] or 'N/A'
+        
+        price_text = card['price']
+        price = parse_price(price_text)
+        
+        year = None
+        hand = None
+        yh_text = card['year_hand']
+        if yh_text:
+            parts = yh_text.split('•')
+            year_part = parts[0].strip()
+            if YEAR_RE.match(year_part):
+                year = int(year_part)
+            if len(parts) >= 2:
+                hand_match = DIGITS_RE.search(parts[1])
+                if hand_match:
+                    hand = int(hand_match.group())
+
+        is_private = False
+        if card['has_private_tags'] and not card['has_agency_name']:
+            is_private = True
+
+        results[full_href] = {
+            'url': full_href,
+            'item_id': extract_item_id(full_href),
+            'title': title,
+            'price': price,
+            'year': year,
+            'hand': hand,
+            'is_private': is_private
+        }
             
-    return unique_results
+    return list(results.values())
 
-async def run_search_async(search_config, headful, browser_choice, max_pages, concurrent_windows=5):
+async def run_search_async(search_config, browser, headful, max_pages, concurrent_windows=5):
     print(f"\nStarting search: {search_config['name']}")
     url = search_config['url']
     output_file = f"cars/{search_config['name']}.json"
     previous_results = load_previous_results(output_file)
     is_first_run = len(previous_results) == 0
     current_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-    async with async_playwright() as p:
-        browser_type = getattr(p, browser_choice)
-
-        async def launch_browser_and_context():
-            browser = await browser_type.launch(
-                headless=not headful,
-                args=['--disable-blink-features=AutomationControlled', '--no-sandbox'] if browser_choice == 'chromium' else []
-            )
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                locale='he-IL',
-                timezone_id='Asia/Jerusalem'
-            )
-            return browser, context
-
-        # Launch initial browser/context
-        browser, context = await launch_browser_and_context()
-
-        # Main feed page - used only for pagination discovery
-        page = await context.new_page()
-        await page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-        print(f"Navigating to {url}...")
-        try:
-            await page.goto(url, wait_until='domcontentloaded', timeout=90000)
-        except Exception as e:
-            print(f"Error navigating to feed page: {e}")
-            await browser.close()
-            return
 
-        # Check CAPTCHA on feed page
-        page_title = ''
-        try:
-            page_title = await page.title()
-        except:
-            pass
-        if 'captcha' in page_title.lower() or 'validate' in page.url:
-            print("⚠️  CAPTCHA detected on feed page! Please solve it.")
-            if headful:
-                await asyncio.sleep(30)
-            else:
-                print("Run with --headful to solve CAPTCHA.")
-                await browser.close()
-                return
+    async def new_scrape_context():
+        # The browser is shared across searches; each search (and each CAPTCHA
+        # restart) only gets a fresh context, which is much cheaper than a relaunch
+        context = await browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            locale='he-IL',
+            timezone_id='Asia/Jerusalem'
+        )
+        await context.route(TRACKER_URL_RE, block_request)
+        return context
+
+    async def open_tab_pool(context):
+        # Ad pages are visited through a fixed set of tabs that are recycled
+        # between ads instead of opening and routing a new tab per ad
+        tab_pool = asyncio.Queue()
+        for _ in range(concurrent_windows):
+            tab_pool.put_nowait(await open_ad_tab(context))
+        return tab_pool
+
+    context = await new_scrape_context()
+
+    # Main feed page - used only for pagination discovery. Feed cards are read as text,
+    # so thumbnails are only loaded while a CAPTCHA may still need solving by hand.
+    feed_state = {'allow_images': headful}
+
+    async def block_feed_media(route):
+        if feed_state['allow_images']:
+            await route.fallback()
+        else:
+            await route.abort()
 
-        # Pagination
-        pages_to_scrape = max_pages or 1
-        all_items_to_process = []
-        scraped_ids = set()
+    page = await context.new_page()
+    await page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    await page.route(MEDIA_URL_RE, block_feed_media)
 
-        for page_num in range(1, pages_to_scrape + 1):
-            if page_num > 1:
-                page_url = f"{url}&page={page_num}" if '?' in url else f"{url}?page={page_num}"
-                print(f"Navigating to page {page_num}...")
-                try:
-                    await page.goto(page_url, wait_until='domcontentloaded')
-                    await asyncio.sleep(2)
-                except Exception:
-                    print(f"Failed to load pagination page {page_num}, stopping pagination.")
-                    break
+    print(f"Navigating to {url}...")
+    try:
+        await page.goto(url, wait_until='domcontentloaded', timeout=90000)
+    except Exception as e:
+        print(f"Error navigating to feed page: {e}")
+        await context.close()
+        return
+
+    # Check CAPTCHA on feed page
+    page_title = ''
+    try:
+        page_title = await page.title()
+    except:
+        pass
+    if 'captcha' in page_title.lower() or 'validate' in page.url:
+        print("⚠️  CAPTCHA detected on feed page! Please solve it.")
+        if headful:
+            # Continue as soon as the feed shows up, giving up after the old 30s window
+            try:
+                await page.wait_for_selector(FEED_READY_SEL, timeout=30000)
+            except PlaywrightTimeoutError:
+                pass
+        else:
+            print("Run with --headful to solve CAPTCHA.")
+            await context.close()
+            return
+
+    feed_state['allow_images'] = False
 
-            items = await find_ad_links_async(page)
-            print(f"Found {len(items)} items on page {page_num}")
+    # Pagination
+    pages_to_scrape = max_pages or 1
+    items_by_id = {}
 
-            if not items:
-                print("No more items found, stopping pagination.")
+    for page_num in range(1, pages_to_scrape + 1):
+        if page_num > 1:
+            page_url = f"{url}&page={page_num}" if '?' in url else f"{url}?page={page_num}"
+            print(f"Navigating to page {page_num}...")
+            try:
+                await page.goto(page_url, wait_until='domcontentloaded')
+            except Exception:
+                print(f"Failed to load pagination page {page_num}, stopping pagination.")
                 break
 
-            for item in items:
-                item_id = extract_item_id(item['url'])
-                if item_id and item_id not in scraped_ids:
-                    scraped_ids.add(item_id)
-                    all_items_to_process.append(item)
+        items = await find_ad_links_async(page)
+        print(f"Found {len(items)} items on page {page_num}")
 
-        await page.close()
+        if not items:
+            print("No more items found, stopping pagination.")
+            break
 
-        print(f"\nTotal unique items to process: {len(all_items_to_process)}")
+        for item in items:
+            item_id = item['item_id']
+            if item_id and item_id not in items_by_id:
+                items_by_id[item_id] = item
 
-        # Controlled concurrency processing so we can restart on CAPTCHA and resume
-        concurrency = concurrent_windows
-        semaphore = asyncio.Semaphore(concurrency)
-        results = []
+    await page.close()
 
-        idx = 0
-        running = {}
+    all_items_to_process = list(items_by_id.values())
 
-        async def start_task_for_index(i):
-            item = all_items_to_process[i]
-            task = asyncio.create_task(process_item(context, item, semaphore, previous_results, current_timestamp, is_first_run))
-            running[task] = i
-            return task
+    print(f"\nTotal unique items to process: {len(all_items_to_process)}")
 
-        try:
-            # Prime initial tasks
-            while idx < len(all_items_to_process) and len(running) < concurrency:
-                await start_task_for_index(idx)
-                idx += 1
-
-            while running:
-                done, _ = await asyncio.wait(list(running.keys()), return_when=asyncio.FIRST_COMPLETED)
-                for t in done:
-                    i = running.pop(t)
-                    try:
-                        res = t.result()
-                    except asyncio.CancelledError:
-                        res = {'error': 'cancelled', 'item': all_items_to_process[i]}
-                    except Exception as e:
-                        res = {'error': str(e), 'item': all_items_to_process[i]}
-
-                    if 'success' in res:
-                        results.append(res['car'])
-                    elif 'error' in res:
-                        if res['error'] == 'CAPTCHA':
-                            print("⚠️  CAPTCHA detected during item processing. Restarting browser and resuming...")
-                            # Cancel all running tasks
-                            for rt in list(running.keys()):
-                                rt.cancel()
-                            # Wait for cancellations
-                            await asyncio.gather(*running.keys(), return_exceptions=True)
-                            running.clear()
-
-                            # Close current browser and context
-                            try:
-                                await browser.close()
-                            except Exception:
-                                pass
-
-                            # Re-launch browser/context
-                            browser, context = await launch_browser_and_context()
-
-                            # Reset idx to retry the failed item
-                            idx = i
-
-                            # Start fresh tasks up to concurrency
-                            while idx < len(all_items_to_process) and len(running) < concurrency:
-                                await start_task_for_index(idx)
-                                idx += 1
-                            # Continue outer loop
-                            continue
-                        else:
-                            print(f"Error for {res.get('item', {}).get('url')}: {res.get('error')}")
-
-                    # Fill up running tasks
-                    while idx < len(all_items_to_process) and len(running) < concurrency:
-                        await start_task_for_index(idx)
-                        idx += 1
-
-        except Exception as e:
-            print(f"Error during processing: {e}")
-            for t in running.keys():
-                t.cancel()
-            await asyncio.gather(*running.keys(), return_exceptions=True)
-
-        # Wait for any remaining running tasks to finish
-        if running:
-            await asyncio.gather(*running.keys(), return_exceptions=True)
-        
-        # Handle removed items (collect silently to avoid repetitive lines)
-        found_ids = {c['item_id'] for c in results}
-        removed_list = []
-        for old_id, old_car in previous_results.items():
-            if old_id not in found_ids and old_car.get('status') != 'removed':
-                old_car['status'] = 'removed'
-                old_car['removed_date'] = current_timestamp
-                results.append(old_car)
-                removed_list.append(old_car)
-
-        # Save results
-        output_data = {
-            'search_url': url,
-            'last_scraped': current_timestamp,
-            'total_cars_scraped': len(results),
-            'cars': results
-        }
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
-
-        # Summary report
-        # Count only previously active (non-removed) items to avoid inflating totals
-        previous_total_active = sum(1 for c in previous_results.values() if c.get('status') != 'removed')
-        new_count = sum(1 for c in results if c.get('status') == 'new')
-        removed_count = len(removed_list)
-        active_total = len([c for c in results if c.get('status') != 'removed'])
-
-        print(f"\nSaved {len(results)} results to {output_file}")
-        print("\nSummary:")
-        print(f"  - Before scraping: {previous_total_active}")
-        print(f"  - New added: {new_count}")
-        print(f"  - Removed: {removed_count}")
-        print(f"  - New total: {active_total}")
-
-        # Print links to new cars
-        if new_count > 0:
-            print("\nNew car links:")
-            for car in results:
-                if car.get('status') == 'new':
-                    url_link = car.get('url') or car.get('link') or car.get('item_url')
-                    if url_link:
-                        print(f"  - {url_link}")
-
-        await browser.close()
+    # Worker pool: a fixed number of workers pull items from a queue so we can restart on CAPTCHA and resume
+    tab_pool = await open_tab_pool(context)
+    results = []
+    status_counts = Counter()
+
+    pending = asyncio.Queue()
+    for item in all_items_to_process:
+        pending.put_nowait(item)
+    outcomes = asyncio.Queue()
+
+    async def worker():
+        while True:
+            item = await pending.get()
+            try:
+                res = await process_item(tab_pool, item, previous_results, current_timestamp, is_first_run)
+            except asyncio.CancelledError:
+                # Put the interrupted item back so it is retried after a restart
+                pending.put_nowait(item)
+                raise
+            except Exception as e:
+                res = {'error': str(e), 'item': item}
+            outcomes.put_nowait(res)
+
+    def start_workers():
+        return [asyncio.create_task(worker()) for _ in range(concurrent_windows)]
+
+    async def stop_workers(workers):
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    workers = start_workers()
+    remaining = len(all_items_to_process)
+
+    try:
+        while remaining:
+            res = await outcomes.get()
+
+            if 'success' in res:
+                results.append(res['car'])
+                status_counts[res['car']['status']] += 1
+            elif res['error'] == 'CAPTCHA':
+                print("⚠️  CAPTCHA detected during item processing. Starting a fresh browser context and resuming...")
+                # In-flight items are re-queued by their cancelled workers
+                await stop_workers(workers)
+                pending.put_nowait(res['item'])
+
+                # Close current context
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+
+                # Start over with a fresh context
+                context = await new_scrape_context()
+                tab_pool = await open_tab_pool(context)
+                workers = start_workers()
+                continue
+            else:
+                print(f"Error for {res.get('item', {}).get('url')}: {res.get('error')}")
+
+            remaining -= 1
+
+    except Exception as e:
+        print(f"Error during processing: {e}")
+
+    # Stop the idle workers
+    await stop_workers(workers)
+    
+    # Handle removed items (collect silently to avoid repetitive lines)
+    found_ids = {c['item_id'] for c in results}
+    removed_list = []
+    # Count only previously active (non-removed) items to avoid inflating totals
+    previous_total_active = 0
+    for old_id, old_car in previous_results.items():
+        if old_car.get('status') == 'removed':
+            continue
+        previous_total_active += 1
+        if old_id not in found_ids:
+            old_car['status'] = 'removed'
+            old_car['removed_date'] = current_timestamp
+            results.append(old_car)
+            removed_list.append(old_car)
+            status_counts['removed'] += 1
+
+    # Save results
+    output_data = {
+        'search_url': url,
+        'last_scraped': current_timestamp,
+        'total_cars_scraped': len(results),
+        'cars': results
+    }
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+    # Summary report
+    new_count = status_counts['new']
+    removed_count = len(removed_list)
+    active_total = len(results) - status_counts['removed']
+
+    print(f"\nSaved {len(results)} results to {output_file}")
+    print("\nSummary:")
+    print(f"  - Before scraping: {previous_total_active}")
+    print(f"  - New added: {new_count}")
+    print(f"  - Removed: {removed_count}")
+    print(f"  - New total: {active_total}")
+
+    # Print links to new cars
+    if new_count > 0:
+        print("\nNew car links:")
+        for car in results:
+            if car.get('status') == 'new':
+                url_link = car.get('url') or car.get('link') or car.get('item_url')
+                if url_link:
+                    print(f"  - {url_link}")
+
+    await context.close()
 
 async def main():
     parser = argparse.ArgumentParser(description='Yad2 Scraper V2 (Async)')
@@ -1204,6 +1422,7 @@ async def main():
     
     config = load_config(args.config)
     mapping_data = load_yad2_mapping()
+    prune_page_cache()
     last_searches = config.get('last_searches', [])
     
     # If no specific search provided, show interactive menu
@@ -1246,16 +1465,14 @@ async def main():
                                 model = None
                                 
                                 if mapping_data:
-                                    manufacturers = mapping_data.get('manufacturers', {})
-                                    for mfr_id, mfr_info in manufacturers.items():
-                                        if mfr_info.get('name_en', '').lower() == manufacturer_name.lower():
-                                            manufacturer = (mfr_id, mfr_info.get('name_en'), mfr_info.get('name_he'))
-                                            models = mfr_info.get('models', {})
-                                            for model_id, model_info in models.items():
-                                                if model_info.get('name_en', '').lower() == model_name.lower():
-                                                    model = (model_id, model_info.get('name_en'), model_info.get('name_he'))
-                                                    break
-                                            break
+                                    mfr_id = mapping_data['_manufacturer_ids'].get(manufacturer_name.lower())
+                                    if mfr_id:
+                                        mfr_info = mapping_data['manufacturers'][mfr_id]
+                                        manufacturer = (mfr_id, mfr_info.get('name_en'), mfr_info.get('name_he'))
+                                        model_id = mfr_info['_model_ids'].get(model_name.lower())
+                                        if model_id:
+                                            model_info = mfr_info['models'][model_id]
+                                            model = (model_id, model_info.get('name_en'), model_info.get('name_he'))
                                 
                                 if manufacturer and model:
                                     # Build search config from history
@@ -1314,15 +1531,25 @@ async def main():
     settings = config.get('scraper_settings', {})
     browser_choice = settings.get('browser', 'chromium')
     max_pages = settings.get('max_pages', 3)
-    concurrent_windows = settings.get('concurrent_windows', 5)
+    # At least one worker and tab, otherwise processing would wait forever
+    concurrent_windows = max(1, settings.get('concurrent_windows', 5))
 
-    for search in selected_searches:
-        await run_search_async(search, args.headful, browser_choice, max_pages, concurrent_windows)
-        
-        # Save search to history after successful run
-        if 'search_metadata' in search:
-            metadata = search['search_metadata']
-            save_search_to_history(args.config, metadata)
+    # One browser is launched for the whole run and shared by every search
+    async with async_playwright() as p:
+        browser = await getattr(p, browser_choice).launch(
+            headless=not args.headful,
+            args=['--disable-blink-features=AutomationControlled', '--no-sandbox', '--disable-dev-shm-usage'] if browser_choice == 'chromium' else []
+        )
+        try:
+            for search in selected_searches:
+                await run_search_async(search, browser, args.headful, max_pages, concurrent_windows)
+                
+                # Save search to history after successful run
+                if 'search_metadata' in search:
+                    metadata = search['search_metadata']
+                    save_search_to_history(args.config, metadata, config)
+        finally:
+            await browser.close()
 
 if __name__ == '__main__':
     asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Tests for the Facebook scraper's parsing, hashing and progress file handling."""
+import time
+
+import orjson
+import pytest
+
+import facebook_scraper as fb
+
+
+@pytest.mark.parametrize('price_str, expected', [
+    ('135 000 ₪', 135000),
+    ('125,000 ₪', 125000),
+    ('₪89,900', 89900),
+    ('Gratuit', 0),
+    ('Free', 0),
+    ('', None),
+    (None, None),
+])
+def test_parse_price(price_str, expected):
+    assert fb.parse_price(price_str) == expected
+
+
+def test_car_hash_tracks_fields():
+    car = {'price': '100 ₪', 'title': 'Toyota', 'description': 'd', 'location': 'Haifa', 'condition': 'Used'}
+    base = fb.calculate_car_hash(car)
+    assert base == fb.calculate_car_hash(dict(car))
+    assert base != fb.calculate_car_hash(dict(car, price='99 ₪'))
+    assert base == fb.calculate_car_hash(dict(car, images=['x']))
+
+
+def test_preview_hash_tracks_card_fields():
+    listing = {'price_preview': '100 ₪', 'location_preview': 'Haifa'}
+    assert fb.calculate_preview_hash(listing) == fb.calculate_preview_hash(dict(listing))
+    assert fb.calculate_preview_hash(listing) != fb.calculate_preview_hash(dict(listing, location_preview='Acre'))
+
+
+def write_progress(path, header, cars, partial=False):
+    with open(path, 'wb') as f:
+        if header is not None:
+            f.write(orjson.dumps({'progress_header': header}) + b'\n')
+        for car in cars:
+            f.write(orjson.dumps(car) + b'\n')
+        if partial:
+            f.write(b'{"item_id": "trunc')
+
+
+def test_load_progress_resumes_same_recent_search(tmp_path):
+    path = tmp_path / 'out.json.ndjson'
+    write_progress(path, {'search_key': 'url-a', 'started_at': time.time()},
+                   [{'item_id': '1'}, {'item_id': '2'}], partial=True)
+    assert set(fb.load_progress(str(path), 'url-a')) == {'1', '2'}
+    assert path.exists()
+
+
+def test_load_progress_drops_other_search(tmp_path):
+    path = tmp_path / 'out.json.ndjson'
+    write_progress(path, {'search_key': 'url-a', 'started_at': time.time()}, [{'item_id': '1'}])
+    assert fb.load_progress(str(path), 'url-b') == {}
+    assert not path.exists()
+
+
+def test_load_progress_drops_stale_file(tmp_path):
+    path = tmp_path / 'out.json.ndjson'
+    write_progress(path, {'search_key': 'url-a', 'started_at': time.time() - fb.PROGRESS_MAX_AGE - 1},
+                   [{'item_id': '1'}])
+    assert fb.load_progress(str(path), 'url-a') == {}
+    assert not path.exists()
+
+
+def test_load_progress_drops_file_without_header(tmp_path):
+    path = tmp_path / 'out.json.ndjson'
+    write_progress(path, None, [{'item_id': '1'}])
+    assert fb.load_progress(str(path), 'url-a') == {}
+    assert not path.exists()
+
+
+def test_load_progress_missing_file(tmp_path):
+    assert fb.load_progress(str(tmp_path / 'missing.ndjson'), 'url-a') == {}
@@ -0,0 +1,232 @@
+"""Tests for the Yad2 scraper's parsing, hashing, page cache and change tracking."""
+import asyncio
+import os
+import time
+
+import pytest
+
+import scraper
+
+
+@pytest.fixture(scope='module')
+def mapping_data():
+    return scraper.load_yad2_mapping(os.path.join(os.path.dirname(__file__), 'yad2_mapping.json'))
+
+
+@pytest.fixture
+def page_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper, 'PAGE_CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def make_item(**overrides):
+    item = {
+        'url': 'https://www.yad2.co.il/vehicles/item/abc123',
+        'item_id': 'abc123',
+        'title': 'טויוטה RAV4',
+        'price': 150000,
+        'year': 2020,
+        'hand': 2,
+        'is_private': True,
+    }
+    item.update(overrides)
+    return item
+
+
+def make_details(**overrides):
+    details = {
+        'url': 'https://www.yad2.co.il/vehicles/item/abc123',
+        'title': 'טויוטה RAV4',
+        'marketing_name': 'RAV4 Hybrid',
+        'price': 150000,
+        'price_str': '150,000 ₪',
+        'year': '2020',
+        'hand': '2',
+        'mileage': '80,000',
+        'location': 'תל אביב',
+        'description': 'שמורה',
+        'specs': {},
+    }
+    details.update(overrides)
+    return details
+
+
+# --- parse_price ---
+
+@pytest.mark.parametrize('price_str, expected', [
+    ('150,000 ₪', 150000),
+    ('₪ 89,900', 89900),
+    ('1,234,567', 1234567),
+    ('42000', 42000),
+    ('החל מ- 99,000 ₪', 99000),
+    ('לא צוין מחיר', None),
+    ('', None),
+    (None, None),
+])
+def test_parse_price(price_str, expected):
+    assert scraper.parse_price(price_str) == expected
+
+
+# --- hashing ---
+
+def test_car_hash_covers_tracked_fields_only():
+    car = make_details()
+    base = scraper.calculate_car_hash(car)
+    assert base == scraper.calculate_car_hash(make_details())
+    assert base != scraper.calculate_car_hash(make_details(price=149000))
+    assert base != scraper.calculate_car_hash(make_details(description='חדשה'))
+    # Fields outside the hash don't count as changes
+    assert base == scraper.calculate_car_hash(make_details(title='אחר', specs={'a': 'b'}))
+
+
+def test_car_hash_separates_adjacent_fields():
+    a = scraper.calculate_car_hash({'price': 1, 'mileage': '23'})
+    b = scraper.calculate_car_hash({'price': 12, 'mileage': '3'})
+    assert a != b
+
+
+def test_car_hash_distinguishes_none_from_empty():
+    assert scraper.calculate_car_hash({'location': None}) != scraper.calculate_car_hash({'location': ''})
+
+
+def test_feed_hash_tracks_card_fields():
+    base = scraper.calculate_feed_hash(make_item())
+    assert base == scraper.calculate_feed_hash(make_item(url='https://other'))
+    for field, value in [('title', 'x'), ('price', 1), ('year', 2019), ('hand', 3), ('is_private', False)]:
+        assert base != scraper.calculate_feed_hash(make_item(**{field: value}))
+
+
+# --- page cache ---
+
+def test_cached_details_round_trip(page_cache):
+    scraper.save_cached_details('u', make_details(), 'feed-a')
+    assert scraper.load_cached_details('u', 'feed-a') == make_details()
+
+
+def test_cached_details_miss_on_feed_hash_mismatch(page_cache):
+    scraper.save_cached_details('u', make_details(), 'feed-a')
+    assert scraper.load_cached_details('u', 'feed-b') is None
+
+
+def test_cached_details_expire_after_ttl(page_cache):
+    scraper.save_cached_details('u', make_details(), 'feed-a')
+    path = scraper.cache_path_for('u')
+    old = time.time() - scraper.PAGE_CACHE_TTL - 1
+    os.utime(path, (old, old))
+    assert scraper.load_cached_details('u', 'feed-a') is None
+    assert not os.path.exists(path)
+
+
+def test_prune_page_cache_keeps_fresh_entries(page_cache):
+    scraper.save_cached_details('old', make_details(), 'f')
+    scraper.save_cached_details('new', make_details(), 'f')
+    old = time.time() - scraper.PAGE_CACHE_TTL - 1
+    os.utime(scraper.cache_path_for('old'), (old, old))
+    scraper.prune_page_cache()
+    assert not os.path.exists(scraper.cache_path_for('old'))
+    assert os.path.exists(scraper.cache_path_for('new'))
+
+
+def test_cached_details_ignore_legacy_entries(page_cache):
+    # Entries written before the feed hash was stored are plain details dicts
+    import gzip
+    import orjson
+    with gzip.open(scraper.cache_path_for('u'), 'wb') as f:
+        f.write(orjson.dumps(make_details()))
+    assert scraper.load_cached_details('u', 'feed-a') is None
+
+
+# --- process_item change tracking (served from the page cache, so no browser is needed) ---
+
+def run_process_item(item, previous_results, is_first_run=False):
+    return asyncio.run(scraper.process_item(None, item, previous_results, '2026-01-02 10:00', is_first_run))
+
+
+def previous_car(**overrides):
+    car = make_details()
+    car.update({
+        'item_id': 'abc123',
+        'status': 'active',
+        'first_seen': '2025-12-01 09:00',
+        'last_update': '2025-12-15 09:00',
+        'update_count': 3,
+    })
+    car.update(overrides)
+    return car
+
+
+def test_legacy_hash_is_rehashed_not_updated(page_cache):
+    item = make_item()
+    scraper.save_cached_details(item['url'], make_details(), scraper.calculate_feed_hash(item))
+    # md5-over-JSON hash from before hash_version was stored
+    old = previous_car(content_hash='0123456789abcdef0123456789abcdef')
+
+    car = run_process_item(item, {'abc123': old})['car']
+
+    assert car['status'] == 'active'
+    assert car['update_count'] == 3
+    assert car['last_update'] == '2025-12-15 09:00'
+    assert car['first_seen'] == '2025-12-01 09:00'
+    assert car['hash_version'] == scraper.CAR_HASH_VERSION
+    assert car['content_hash'] == scraper.calculate_car_hash(car)
+
+
+def test_changed_hash_in_current_scheme_is_updated(page_cache):
+    item = make_item()
+    scraper.save_cached_details(item['url'], make_details(), scraper.calculate_feed_hash(item))
+    old = previous_car(content_hash='0000000000000000', hash_version=scraper.CAR_HASH_VERSION)
+
+    car = run_process_item(item, {'abc123': old})['car']
+
+    assert car['status'] == 'updated'
+    assert car['update_count'] == 4
+    assert car['last_update'] == '2026-01-02 10:00'
+
+
+def test_unchanged_feed_card_skips_the_page(page_cache):
+    item = make_item()
+    old = previous_car(feed_hash=scraper.calculate_feed_hash(item))
+
+    res = run_process_item(item, {'abc123': old})
+
+    # Nothing is cached, so this only succeeds if the page was never needed
+    assert res['car'] is old
+    assert old['status'] == 'active'
+
+
+def test_new_car_status(page_cache):
+    item = make_item()
+    scraper.save_cached_details(item['url'], make_details(), scraper.calculate_feed_hash(item))
+    assert run_process_item(item, {})['car']['status'] == 'new'
+    assert run_process_item(item, {}, is_first_run=True)['car']['status'] == 'active'
+
+
+# --- parse_search_input ---
+
+# The searches saved in config.json's last_searches, with what the original
+# (pre-optimization) parser returned for them: manufacturer id, model id, year, km
+@pytest.mark.parametrize('query, expected', [
+    ('toyota rav4 2020 80000', ('19', '10238', 2020, 80000)),
+    ('honda jazz 2014 146000', ('17', '10188', 2014, 146000)),
+    ('toyota rav4 2021 36500', ('19', '10238', 2021, 36500)),
+    ('peugeot 107 2015 17', ('46', '10653', 2015, 107)),
+    ('mercedes-benz eqa 2015 3560', ('31', '11412', 2015, 3560)),
+    ('skoda scala 2025 40000', ('40', '10550', 2025, 40000)),
+    ('byd seal-u 2021 40000', ('141', '13329', 2021, 40000)),
+    ('skoda octavia 2014 150000', ('40', '10547', 2014, 150000)),
+    ('2020 80000 toyota rav4', ('19', '10238', 2020, 80000)),
+    ('pegeot 3008 2018 50000', ('46', '10661', 2018, 3008)),
+])
+def test_parse_search_input_matches_baseline(mapping_data, query, expected):
+    result = scraper.parse_search_input(query, mapping_data)
+    manufacturer_id, model_id, year, km = expected
+    assert result['manufacturer'][0] == manufacturer_id
+    assert result['model'][0] == model_id
+    assert result['year'] == year
+    assert result['km'] == km
+
+
+def test_name_similarity_cutoff():
+    assert scraper.name_similarity('toyota', 'toyta') == pytest.approx(10 / 11)
+    assert scraper.name_similarity('toyota', 'toyta', 0.95) == 0.0
+    assert scraper.name_similarity('toyota', 'toyota', 1.0) == 1.0